@@ -0,0 +1,159 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+
+RATE = 0.5  # requêtes par seconde en régime permanent (budget de politesse)
+BURST = 1  # requêtes pouvant partir d'un coup après une période calme
+CONCURRENCY = 4  # requêtes en vol au maximum
+MAX_RETRIES = 4
+BACKOFF_BASE = 2.0  # secondes, doublé à chaque nouvel essai
+TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class AsyncFetcher:
+    """
+    Client HTTP asyncio : une session aiohttp partagée (connexions réutilisées), un
+    token bucket pour le débit, un sémaphore pour la concurrence, des réessais avec
+    backoff sur 429/5xx et des requêtes conditionnelles (ETag / Last-Modified).
+
+    `validators` (url -> {"etag", "last_modified"}) peut être sauvegardé entre deux
+    crawls pour sauter les pages inchangées (304). Il n'est mis à jour que par `commit`,
+    une fois la page enregistrée par l'appelant : une page reçue mais perdue (crash,
+    erreur de parsing) sera récupérée à nouveau au prochain crawl.
+    """
+
+    def __init__(self, headers=None, rate=RATE, burst=BURST, concurrency=CONCURRENCY,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, timeout=TIMEOUT, validators=None):
+        self.headers = headers or {}
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.validators = validators if validators is not None else {}
+        self.stats = {"fetched": 0, "not_modified": 0, "retries": 0, "errors": 0}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def _conditional_headers(self, url):
+        validator = self.validators.get(url, {})
+        headers = {}
+        if validator.get("etag"):
+            headers["If-None-Match"] = validator["etag"]
+        if validator.get("last_modified"):
+            headers["If-Modified-Since"] = validator["last_modified"]
+        return headers
+
+    def _backoff(self, attempt):
+        return self.backoff_base * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def fetch(self, url, conditional=True):
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.bucket.acquire()
+                headers = self._conditional_headers(url) if conditional else {}
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        if response.status == 304:
+                            self.stats["not_modified"] += 1
+                            return {"url": url, "status": 304, "text": None, "not_modified": True}
+
+                        if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                            delay = _retry_after(response)
+                            self.stats["retries"] += 1
+                            await asyncio.sleep(self._backoff(attempt) if delay is None else delay)
+                            continue
+
+                        response.raise_for_status()
+                        text = await response.text()
+
+                        validator = {
+                            "etag": response.headers.get("ETag"),
+                            "last_modified": response.headers.get("Last-Modified"),
+                        }
+
+                        self.stats["fetched"] += 1
+                        return {"url": url, "status": response.status, "text": text, "not_modified": False,
+                                "validator": validator}
+
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if attempt == self.max_retries:
+                        raise
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(self._backoff(attempt))
+
+    def commit(self, result):
+        """Garde l'ETag / Last-Modified d'une page récupérée, à appeler une fois la page enregistrée."""
+        validator = result.get("validator")
+        if validator and (validator["etag"] or validator["last_modified"]):
+            self.validators[result["url"]] = validator
+
+    async def _fetch_or_error(self, url, conditional):
+        try:
+            return await self.fetch(url, conditional=conditional)
+        except Exception as e:
+            self.stats["errors"] += 1
+            return {"url": url, "status": None, "text": None, "not_modified": False, "error": e}
+
+    async def fetch_all(self, urls, conditional=True):
+        """
+        Récupère toutes les URLs et renvoie les résultats au fur et à mesure qu'ils arrivent.
+        `conditional` : booléen, ou ensemble des URLs à demander en requête conditionnelle.
+        """
+        if isinstance(conditional, bool):
+            conditional = set(urls) if conditional else set()
+        tasks = [asyncio.create_task(self._fetch_or_error(url, url in conditional)) for url in urls]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,97 @@
+import json
+import re
+import sys
+import time
+
+import prepareNerData
+from prepareNerData import annotate_corpus, init_annotator, normalize_archetype
+
+NUM_WORKERS = prepareNerData.NUM_WORKERS
+
+
+# annotate_tokens d'origine (un appel tokenizer par texte, scan linéaire des offsets)
+def legacy_annotate_tokens(text, tags, tokenizer, archetype_to_keywords, valid_labels):
+    encoding = tokenizer(text, return_offsets_mapping=True, truncation=True)
+    tokens = tokenizer.convert_ids_to_tokens(encoding["input_ids"])[1:-1]
+    offsets = encoding["offset_mapping"][1:-1]
+
+    labels = ["O"] * len(tokens)
+    token_tagged = [False] * len(tokens)
+    text_lower = text.lower()
+
+    for tag in tags:
+        if tag not in archetype_to_keywords:
+            continue
+        norm_tag = normalize_archetype(tag)
+        b_label = f"B-{norm_tag}"
+        i_label = f"I-{norm_tag}"
+
+        if b_label not in valid_labels:
+            continue
+
+        for keyword in archetype_to_keywords[tag]:
+            pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
+            for match in re.finditer(pattern, text_lower):
+                start, end = match.start(), match.end()
+                matched_tokens = []
+
+                for i, (tok_start, tok_end) in enumerate(offsets):
+                    if tok_end <= start:
+                        continue
+                    if tok_start >= end:
+                        break
+                    if tok_start < end and tok_end > start and not token_tagged[i]:
+                        matched_tokens.append(i)
+
+                if matched_tokens:
+                    labels[matched_tokens[0]] = b_label
+                    for i in matched_tokens[1:]:
+                        labels[i] = i_label
+                    for i in matched_tokens:
+                        token_tagged[i] = True
+
+    return tokens, labels
+
+
+def main():
+    input_file = sys.argv[1] if len(sys.argv) > 1 else prepareNerData.INPUT_FILE
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else NUM_WORKERS
+
+    with open(input_file, encoding="utf-8") as f:
+        raw_data = json.load(f)
+    with open(prepareNerData.KEYWORD_FILE, encoding="utf-8") as f:
+        archetype_to_keywords = json.load(f)
+    with open(prepareNerData.LABEL_LIST_FILE, encoding="utf-8") as f:
+        valid_labels = set(json.load(f))
+
+    init_annotator()
+    tokenizer = prepareNerData.tokenizer
+
+    start = time.perf_counter()
+    legacy = [
+        legacy_annotate_tokens(entry["text"], entry["tags"], tokenizer, archetype_to_keywords, valid_labels)
+        for entry in raw_data
+    ]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = list(annotate_corpus(raw_data, num_workers=num_workers))
+    fast_time = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for (tokens, labels), example in zip(legacy, fast)
+        if tokens != example["tokens"] or labels != example["labels"]
+    )
+
+    print(f"📦 {len(raw_data)} textes")
+    print(f"⏱️ Annotation d'origine       : {legacy_time:.2f} s")
+    print(f"⏱️ Annotation batch ({num_workers} proc.) : {fast_time:.2f} s  (x{legacy_time / max(fast_time, 1e-9):.1f})")
+
+    if mismatches:
+        print(f"❌ {mismatches} exemples différents")
+        sys.exit(1)
+    print("✅ Labels BIO identiques")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import hashlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from asyncFetcher import AsyncFetcher
+from edhrecParsers import parse_tag_cards
+
+NUM_PAGES = 200
+RATE = 20.0  # budget de politesse testé, en requêtes par seconde
+CONCURRENCY = 8
+LATENCY = 0.05  # latence simulée du serveur, en secondes
+ERROR_EVERY = 25  # une page sur N répond d'abord 429
+
+
+def fixture_page(i):
+    spans = "".join(f'<span class="Card_name__Mpa7S">Card {i}-{j}</span>' for j in range(50))
+    return f"<html><body><div>{spans}</div></body></html>".encode("utf-8")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Remplaçant local d'edhrec.com : sert /tags/<i> avec ETag, 304 et quelques 429."""
+
+    pages = {}
+    throttled = set()
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        body = self.pages.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        index = int(self.path.rsplit("/", 1)[1])
+        if index % ERROR_EVERY == 0 and self.path not in self.throttled:
+            self.throttled.add(self.path)
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    FixtureHandler.pages = {f"/tags/{i}": fixture_page(i) for i in range(NUM_PAGES)}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def crawl(urls, rate, concurrency, validators):
+    cards = 0
+    start = time.perf_counter()
+    async with AsyncFetcher(rate=rate, burst=concurrency, concurrency=concurrency,
+                            backoff_base=0.1, validators=validators) as fetcher:
+        async for result in fetcher.fetch_all(urls):
+            if result.get("text"):
+                cards += len(parse_tag_cards(result["text"]))
+                fetcher.commit(result)
+    return time.perf_counter() - start, cards, fetcher.stats
+
+
+def main():
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else RATE
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else CONCURRENCY
+
+    server = start_server()
+    host, port = server.server_address
+    urls = [f"http://{host}:{port}/tags/{i}" for i in range(NUM_PAGES)]
+    validators = {}
+
+    print(f"🌐 {NUM_PAGES} pages, budget {rate} req/s, concurrence {concurrency}, latence {LATENCY * 1000:.0f} ms")
+
+    elapsed, cards, stats = asyncio.run(crawl(urls, rate, concurrency, validators))
+    print(f"⏱️ Crawl initial : {NUM_PAGES / elapsed:.1f} pages/s ({elapsed:.2f} s, {cards} cartes) {stats}")
+
+    elapsed, cards, stats = asyncio.run(crawl(urls, rate, concurrency, validators))
+    print(f"⏱️ Re-crawl      : {NUM_PAGES / elapsed:.1f} pages/s ({elapsed:.2f} s, {cards} cartes) {stats}")
+
+    # Référence : une requête à la fois, sans pause, comme l'ancien script sans ses sleeps
+    elapsed, cards, stats = asyncio.run(crawl(urls, rate, 1, {}))
+    print(f"⏱️ Séquentiel    : {NUM_PAGES / elapsed:.1f} pages/s ({elapsed:.2f} s)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# inferenceCli / inferenceNERmtgArch ne sont pas importés ici : dans un sous-processus --run,
+# leur import fait partie de la mesure
+TEXT = "Whenever another creature you control dies, draw a card."
+REPEAT = 3
+MODES = ("torch", "onnx", "lite", "daemon")
+DAEMON_TIMEOUT = 120  # secondes pour que le démon ouvre son socket
+
+
+def run_mode(mode, model_dir, onnx_dir, socket_path):
+    # Dans un processus neuf : import du point d'entrée, chargement du modèle, première prédiction
+    start = time.perf_counter()
+    if mode in ("torch", "onnx"):
+        import inferenceNERmtgArch as entry
+        imported = time.perf_counter()
+        entry.load_model(model_dir if mode == "torch" else onnx_dir, mode)
+        loaded = time.perf_counter()
+        entry.predict_batch([TEXT])
+    else:
+        import inferenceCli as entry
+        imported = time.perf_counter()
+        if mode == "lite":
+            model = entry.LiteModel(onnx_dir)
+            loaded = time.perf_counter()
+            model.predict_batch([TEXT])
+        else:
+            loaded = imported
+            entry.request(socket_path, {"texts": [TEXT]})
+    done = time.perf_counter()
+
+    return {
+        "import_s": imported - start,
+        "load_s": loaded - imported,
+        "first_prediction_s": done - loaded,
+        "torch": "torch" in sys.modules,
+        "transformers": "transformers" in sys.modules,
+    }
+
+
+def measure(mode, args, socket_path):
+    runs = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, __file__, "--run", mode, "--model-dir", args.model_dir, "--onnx-dir", args.onnx_dir,
+             "--socket", socket_path],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        run["wall_s"] = time.perf_counter() - start  # démarrage de l'interpréteur compris
+        runs.append(run)
+    report = {key: statistics.median(run[key] for run in runs) for key in ("import_s", "load_s", "first_prediction_s", "wall_s")}
+    report["heavy_imports"] = [name for name in ("torch", "transformers") if runs[0][name]]
+    return report
+
+
+def start_daemon(onnx_dir, socket_path):
+    cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inferenceCli.py")
+    daemon = subprocess.Popen(
+        [sys.executable, cli, "--serve", "--socket", socket_path, "--model-dir", onnx_dir],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + DAEMON_TIMEOUT
+    while not os.path.exists(socket_path):
+        if daemon.poll() is not None or time.monotonic() > deadline:
+            raise SystemExit("❌ Le démon n'a pas démarré")
+        time.sleep(0.05)
+    return daemon
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import et de première prédiction des points d'entrée d'inférence")
+    parser.add_argument("modes", nargs="*", default=list(MODES), help=f"parmi {', '.join(MODES)}")
+    parser.add_argument("--model-dir", help="modèle PyTorch (défaut : inferenceNERmtgArch.MODEL_DIR)")
+    parser.add_argument("--onnx-dir", help="export ONNX (défaut : inferenceCli.MODEL_DIR)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--socket", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_mode(args.run, args.model_dir, args.onnx_dir, args.socket)))
+        return
+
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(f"modes inconnus : {', '.join(sorted(unknown))}")
+
+    import inferenceCli
+    import inferenceNERmtgArch
+
+    args.model_dir = args.model_dir or inferenceNERmtgArch.MODEL_DIR
+    args.onnx_dir = args.onnx_dir or inferenceCli.MODEL_DIR
+
+    reports = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        socket_path = os.path.join(tmp_dir, "bench.sock")
+        for mode in args.modes:
+            if mode == "daemon":
+                daemon = start_daemon(args.onnx_dir, socket_path)
+                try:
+                    reports[mode] = measure(mode, args, socket_path)
+                finally:
+                    inferenceCli.request(socket_path, {"shutdown": True})
+                    daemon.wait()
+            else:
+                reports[mode] = measure(mode, args, socket_path)
+
+    print(f"⏱️ Médiane sur {args.repeat} processus neufs")
+    print(f"{'mode':>8} {'import s':>9} {'chargement s':>13} {'1re prédiction s':>17} {'total s':>8}  imports lourds")
+    for mode, report in reports.items():
+        print(f"{mode:>8} {report['import_s']:>9.3f} {report['load_s']:>13.3f} {report['first_prediction_s']:>17.3f} "
+              f"{report['wall_s']:>8.3f}  {', '.join(report['heavy_imports']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+
+from datasets import Dataset
+from transformers import AutoConfig, AutoModelForTokenClassification, AutoTokenizer, DataCollatorForTokenClassification, Trainer, TrainingArguments
+
+import trainNER
+from trainingProfile import available_cores, cpu_supports_bf16, training_profile
+
+NUM_EXAMPLES = 512
+MAX_STEPS = 20
+
+
+def fixture_dataset(tokenizer, num_labels, num_examples=NUM_EXAMPLES, seed=42):
+    # Exemples synthétiques de la taille d'un texte oracle : 20 à 80 wordpieces
+    rng = random.Random(seed)
+    vocab_ids = list(range(1000, tokenizer.vocab_size))
+    rows = {"input_ids": [], "labels": []}
+    for _ in range(num_examples):
+        length = rng.randint(20, 80)
+        ids = [rng.choice(vocab_ids) for _ in range(length)]
+        rows["input_ids"].append([tokenizer.cls_token_id] + ids + [tokenizer.sep_token_id])
+        rows["labels"].append([-100] + [rng.randrange(num_labels) for _ in ids] + [-100])
+    return Dataset.from_dict(rows)
+
+
+def run_config(threads, workers, bf16, batch_size, max_steps):
+    label_list, label_to_id, id_to_label = trainNER.load_labels()
+    tokenizer = AutoTokenizer.from_pretrained(trainNER.MODEL_CHECKPOINT)
+    config = AutoConfig.from_pretrained(
+        trainNER.MODEL_CHECKPOINT, num_labels=len(label_list), id2label=id_to_label, label2id=label_to_id
+    )
+    model = AutoModelForTokenClassification.from_pretrained(trainNER.MODEL_CHECKPOINT, config=config)
+    profile = training_profile("cpu", num_threads=threads, dataloader_workers=workers, bf16=bf16, batch_size=batch_size)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        trainer = Trainer(
+            model=model,
+            args=TrainingArguments(output_dir=output_dir, max_steps=max_steps, report_to="none", save_strategy="no", **profile),
+            train_dataset=fixture_dataset(tokenizer, len(label_list)),
+            data_collator=DataCollatorForTokenClassification(tokenizer),
+        )
+        metrics = trainer.train().metrics
+
+    return {
+        "threads": threads,
+        "workers": workers,
+        "bf16": bf16,
+        "batch_size": batch_size,
+        "gradient_accumulation_steps": profile["gradient_accumulation_steps"],
+        "samples_per_s": metrics["train_samples_per_second"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit d'entraînement CPU (samples/s) selon threads, workers et bf16")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--run", help="usage interne : threads,workers,bf16,batch_size")
+    args = parser.parse_args()
+
+    if args.run:
+        threads, workers, bf16, batch_size = args.run.split(",")
+        print(json.dumps(run_config(int(threads), int(workers), bf16 == "1", int(batch_size), args.max_steps)))
+        return
+
+    cores = available_cores()
+    configs = []
+    for threads in sorted({max(1, cores // 4), max(1, cores // 2), cores}):
+        for bf16 in ([False, True] if cpu_supports_bf16() else [False]):
+            configs.append((threads, 0, bf16, 8))
+    configs.append((max(1, cores - 2), 2, cpu_supports_bf16(), 8))
+    configs.append((cores, 0, cpu_supports_bf16(), 16))
+
+    # Un sous-processus par configuration : les threads torch ne se règlent qu'une fois par processus
+    print(f"🖥️ {cores} coeurs disponibles, {args.max_steps} steps par configuration")
+    for threads, workers, bf16, batch_size in configs:
+        output = subprocess.run(
+            [sys.executable, __file__, "--max-steps", str(args.max_steps),
+             "--run", f"{threads},{workers},{int(bf16)},{batch_size}"],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"🔧 threads={r['threads']:3d} workers={r['workers']} bf16={str(r['bf16']):5} "
+            f"batch={r['batch_size']:2d}×{r['gradient_accumulation_steps']} : {r['samples_per_s']:.1f} samples/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
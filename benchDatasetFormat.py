@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from datasets import load_dataset
+from transformers import AutoTokenizer
+
+import trainNER
+from nerShards import open_shards, write_shards
+from prepareNerData import save_examples
+
+
+def dir_size_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1e6
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names) / 1e6
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON + tokenisation vs shards binaires : taille, écriture, chargement")
+    parser.add_argument("--tokenizer", default=trainNER.MODEL_CHECKPOINT)
+    args = parser.parse_args()
+
+    splits = {}
+    for split, path in trainNER.DATA_FILES.items():
+        with open(path, encoding="utf-8") as f:
+            splits[split] = json.load(f)
+    label_list, label_to_id, _ = trainNER.load_labels()
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_files = {split: os.path.join(tmp_dir, os.path.basename(path)) for split, path in trainNER.DATA_FILES.items()}
+        _, json_write = timed(lambda: [save_examples(splits[split], path) for split, path in json_files.items()])
+        json_size = sum(dir_size_mb(path) for path in json_files.values())
+
+        # Chemin actuel de trainNER sans cache : parse JSON puis re-tokenisation des wordpieces
+        def load_json_path():
+            dataset = load_dataset("json", data_files=json_files, cache_dir=os.path.join(tmp_dir, "hf_cache"))
+            return dataset.map(
+                trainNER.tokenize_and_align_labels,
+                batched=True,
+                batch_size=trainNER.TOKENIZE_BATCH_SIZE,
+                remove_columns=dataset["train"].column_names,
+                fn_kwargs={"tokenizer": tokenizer, "label_to_id": label_to_id},
+            )
+
+        tokenized, json_load = timed(load_json_path)
+
+        shard_dir = os.path.join(tmp_dir, "ner_shards")
+        _, shard_write = timed(lambda: write_shards(splits, tokenizer, label_list, shard_dir))
+        shard_size = dir_size_mb(shard_dir)
+
+        # mmap + lecture de chaque exemple, pour un coût comparable au dataset tokenisé complet
+        def load_shard_path():
+            datasets = open_shards(shard_dir, trainNER.MAX_LENGTH)
+            for dataset in datasets.values():
+                for i in range(len(dataset)):
+                    dataset[i]
+            return datasets
+
+        shards, shard_load = timed(load_shard_path)
+
+        realigned = sum(
+            1
+            for split in splits
+            for i, ids in enumerate(tokenized[split]["input_ids"])
+            if ids != shards[split][i]["input_ids"]
+        )
+
+    examples = sum(len(examples) for examples in splits.values())
+    print(f"📦 {examples} exemples ({', '.join(f'{s}: {len(e)}' for s, e in splits.items())})")
+    print(f"🔧 JSON   : {json_size:8.2f} Mo, écriture {json_write:6.2f} s, chargement + tokenisation {json_load:6.2f} s")
+    print(f"🔧 Shards : {shard_size:8.2f} Mo, écriture {shard_write:6.2f} s, chargement mmap {shard_load:6.2f} s")
+    print(f"   → taille ×{json_size / shard_size:.1f} plus petite, chargement ×{json_load / max(shard_load, 1e-9):.1f} plus rapide")
+    print(f"⚠️ {realigned} exemples dont la re-tokenisation JSON redécoupe les wordpieces (ids différents)")
+
+
+if __name__ == "__main__":
+    main()
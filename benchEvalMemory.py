@@ -0,0 +1,109 @@
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import evaluate
+from datasets import load_dataset
+from transformers import AutoTokenizer, AutoModelForTokenClassification, DataCollatorForTokenClassification, Trainer, TrainingArguments
+
+import trainNER
+
+MODES = ("logits", "reduced")
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+# compute_metrics d'origine : logits complets, argmax puis compréhensions imbriquées
+def legacy_compute_metrics(id_to_label):
+    metric = evaluate.load("seqeval")
+
+    def compute_metrics(p):
+        predictions, labels = p
+        predictions = predictions.argmax(-1)
+
+        true_predictions = [
+            [id_to_label[p] for (p, l) in zip(prediction, label) if l != -100]
+            for prediction, label in zip(predictions, labels)
+        ]
+        true_labels = [
+            [id_to_label[l] for (p, l) in zip(prediction, label) if l != -100]
+            for prediction, label in zip(predictions, labels)
+        ]
+        return metric.compute(predictions=true_predictions, references=true_labels)
+
+    return compute_metrics
+
+
+def run_mode(mode, model_dir, batch_size):
+    dataset = load_dataset("json", data_files=trainNER.DATA_FILES, field=None)
+    label_list, label_to_id, id_to_label = trainNER.load_labels()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    tokenized = trainNER.load_tokenized_datasets(dataset, tokenizer, label_to_id)
+    model = AutoModelForTokenClassification.from_pretrained(model_dir)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        trainer = Trainer(
+            model=model,
+            args=TrainingArguments(output_dir=output_dir, per_device_eval_batch_size=batch_size, report_to="none"),
+            data_collator=DataCollatorForTokenClassification(tokenizer),
+            compute_metrics=(
+                trainNER.build_compute_metrics(label_list) if mode == "reduced" else legacy_compute_metrics(id_to_label)
+            ),
+            preprocess_logits_for_metrics=trainNER.reduce_logits if mode == "reduced" else None,
+        )
+
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        metrics = trainer.evaluate(eval_dataset=tokenized["test"])
+        elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "examples": len(tokenized["test"]),
+        "eval_time_s": elapsed,
+        "rss_before_eval_mb": rss_before,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "f1": metrics.get("eval_overall_f1"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire et temps d'évaluation : logits complets vs réduits")
+    parser.add_argument("--model-dir", default=trainNER.OUTPUT_DIR)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--mode", choices=MODES, help="usage interne : un seul mode dans ce processus")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.model_dir, args.batch_size)))
+        return
+
+    # Un sous-processus par mode : le pic de RSS de l'un ne pollue pas l'autre
+    results = []
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--model-dir", args.model_dir, "--batch-size", str(args.batch_size)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"📦 Split de test : {results[0]['examples']} exemples")
+    for r in results:
+        print(
+            f"🔧 {r['mode']:8} : {r['eval_time_s']:7.2f} s, pic RSS {r['peak_rss_mb']:8.1f} Mo "
+            f"(+{r['peak_rss_mb'] - r['rss_before_eval_mb']:.1f} Mo pendant l'éval), F1 {r['f1']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
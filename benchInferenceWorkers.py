@@ -0,0 +1,89 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import inferenceNERmtgArch
+from benchOnnx import TEST_FILE, load_test_texts
+from inferenceWorkers import BATCH_SIZE, InferenceWorkerPool
+
+MAX_TEXTS = 2048  # textes utilisés pour la mesure de débit
+
+
+def memory_mb(pid):
+    # RSS compte les pages partagées dans chaque processus, PSS les répartit entre eux
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss"):
+                memory[name.lower()] = int(value.split()[0]) / 1024
+    return memory
+
+
+def run_workers(num_workers, model_dir, test_file, batch_size):
+    tokenizer = inferenceNERmtgArch.load_model(model_dir, "torch")[0]
+    texts = load_test_texts(test_file, tokenizer)[:MAX_TEXTS]
+
+    with InferenceWorkerPool(num_workers, model_dir=model_dir, batch_size=batch_size) as pool:
+        pool.predict_batch(texts[:num_workers * batch_size])  # warm-up de chaque worker
+        start = time.perf_counter()
+        results = pool.predict_batch(texts)
+        elapsed = time.perf_counter() - start
+
+        pids = [os.getpid()] + [child.pid for child in multiprocessing.active_children()]
+        memory = [memory_mb(pid) for pid in pids]
+        labels = json.dumps([[token["label"] for token in result["tokens"]] for result in results])
+        return {
+            "workers": num_workers,
+            "threads_per_worker": pool.threads_per_worker,
+            "texts": len(texts),
+            "texts_per_s": len(texts) / elapsed,
+            "rss_mb": sum(m["rss"] for m in memory),
+            "pss_mb": sum(m["pss"] for m in memory),
+            "labels_sha256": hashlib.sha256(labels.encode("utf-8")).hexdigest()[:16],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit et mémoire du pool d'inférence, de 1 à N workers")
+    parser.add_argument("--model-dir", default=inferenceNERmtgArch.MODEL_DIR)
+    parser.add_argument("--test-file", default=TEST_FILE)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--run", type=int, help=argparse.SUPPRESS)  # un nombre de workers, dans un sous-processus
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_workers(args.run, args.model_dir, args.test_file, args.batch_size)))
+        return
+
+    # Chaque configuration dans un processus neuf : mémoire mesurée sans les restes de la précédente
+    worker_counts = sorted({1, *(2 ** i for i in range(args.max_workers.bit_length()) if 2 ** i <= args.max_workers), args.max_workers})
+    reports = []
+    for num_workers in worker_counts:
+        output = subprocess.run(
+            [sys.executable, __file__, "--run", str(num_workers), "--model-dir", args.model_dir,
+             "--test-file", args.test_file, "--batch-size", str(args.batch_size)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        reports.append(json.loads(output.strip().splitlines()[-1]))
+
+    base = reports[0]
+    print(f"📦 {base['texts']} textes, batch {args.batch_size}")
+    print(f"{'workers':>8} {'threads':>8} {'textes/s':>10} {'speedup':>8} {'RSS Mo':>9} {'PSS Mo':>9} {'N copies Mo':>12}  labels")
+    for report in reports:
+        # Estimation sans partage : N processus indépendants, chacun comme le run à 1 worker
+        copies = base["pss_mb"] * report["workers"]
+        same = "=" if report["labels_sha256"] == base["labels_sha256"] else "≠"
+        print(f"{report['workers']:>8} {report['threads_per_worker']:>8} {report['texts_per_s']:>10.1f} "
+              f"{report['texts_per_s'] / base['texts_per_s']:>7.2f}x {report['rss_mb']:>9.0f} {report['pss_mb']:>9.0f} "
+              f"{copies:>12.0f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import json
+import re
+import sys
+import time
+
+from keywordMatcher import KeywordMatcher
+
+CARDS_FILE = "oracle-cards-20250404090221.json"
+KEYWORD_FILE = "archetype_to_keywords.json"
+
+
+# Boucle d'origine de mergeTagsAndComs.py, conservée comme référence
+def legacy_keyword_tags(text, archetype_to_keywords):
+    tags = set()
+    text_lower = text.lower()
+    for archetype, keywords in archetype_to_keywords.items():
+        for keyword in keywords:
+            pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
+            if re.search(pattern, text_lower):
+                tags.add(archetype)
+                break
+    return tags
+
+
+def main():
+    cards_file = sys.argv[1] if len(sys.argv) > 1 else CARDS_FILE
+    keyword_file = sys.argv[2] if len(sys.argv) > 2 else KEYWORD_FILE
+
+    with open(cards_file, "r", encoding="utf-8") as f:
+        cards = json.load(f)
+    with open(keyword_file, "r", encoding="utf-8") as f:
+        archetype_to_keywords = json.load(f)
+
+    texts = [f"{c.get('oracle_text', '')}\n{c.get('type_line', '')}".strip() for c in cards]
+    n_keywords = sum(len(k) for k in archetype_to_keywords.values())
+    print(f"📦 {len(texts)} cartes, {len(archetype_to_keywords)} archétypes, {n_keywords} mots-clés")
+
+    start = time.perf_counter()
+    legacy = [legacy_keyword_tags(text, archetype_to_keywords) for text in texts]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(archetype_to_keywords)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = [matcher.match(text) for text in texts]
+    match_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy, fast) if a != b)
+
+    print(f"⏱️ Boucle regex     : {legacy_time:.2f} s")
+    print(f"⏱️ Automate (build) : {build_time:.3f} s")
+    print(f"⏱️ Automate (match) : {match_time:.2f} s  (x{legacy_time / max(match_time, 1e-9):.1f})")
+
+    if mismatches:
+        print(f"❌ {mismatches} cartes avec des tags différents")
+        sys.exit(1)
+    print("✅ Tags identiques sur toutes les cartes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import time
+
+import inferenceNERmtgArch
+from exportOnnx import OUTPUT_DIR, QUANTIZED_FILE
+
+TEST_FILE = "ner_test.json"
+BATCH_SIZES = (1, 8, 32, 64)
+MAX_TEXTS = 512  # textes utilisés pour la mesure de débit
+
+
+def load_test_texts(test_file, tokenizer):
+    # ner_test.json contient des wordpieces : on reconstruit le texte pour repasser par le tokenizer
+    with open(test_file, encoding="utf-8") as f:
+        examples = json.load(f)
+    return [tokenizer.convert_tokens_to_string(example["tokens"]) for example in examples]
+
+
+def run_backend(model_dir, backend_name, onnx_file, texts):
+    inferenceNERmtgArch.unload_model()
+    inferenceNERmtgArch.load_model(model_dir, backend_name, onnx_file)
+    labels = [[token["label"] for token in result["tokens"]] for result in inferenceNERmtgArch.predict_batch(texts)]
+
+    timings = {}
+    sample = texts[:MAX_TEXTS]
+    for batch_size in BATCH_SIZES:
+        inferenceNERmtgArch.predict_batch(sample[:batch_size], batch_size=batch_size)  # warm-up
+        start = time.perf_counter()
+        inferenceNERmtgArch.predict_batch(sample, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        n_batches = -(-len(sample) // batch_size)
+        timings[batch_size] = {
+            "texts_per_s": len(sample) / elapsed,
+            "ms_per_batch": elapsed / n_batches * 1000,
+        }
+    return labels, timings
+
+
+def agreement(reference, candidate):
+    same = total = exact = 0
+    for ref, cand in zip(reference, candidate):
+        same += sum(a == b for a, b in zip(ref, cand))
+        total += len(ref)
+        exact += ref == cand
+    return same / max(total, 1), exact / max(len(reference), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et débit PyTorch fp32 vs ONNX Runtime (fp32 / int8)")
+    parser.add_argument("--model-dir", default=inferenceNERmtgArch.MODEL_DIR)
+    parser.add_argument("--onnx-dir", default=OUTPUT_DIR)
+    parser.add_argument("--test-file", default=TEST_FILE)
+    args = parser.parse_args()
+
+    tokenizer, _ = inferenceNERmtgArch.load_model(args.model_dir, "torch")
+    texts = load_test_texts(args.test_file, tokenizer)
+    print(f"📦 {len(texts)} textes de test")
+
+    configs = [
+        ("torch fp32", args.model_dir, "torch", None),
+        ("onnx fp32", args.onnx_dir, "onnx", inferenceNERmtgArch.ONNX_FILE),
+        ("onnx int8", args.onnx_dir, "onnx", QUANTIZED_FILE),
+    ]
+
+    reference = None
+    for name, model_dir, backend_name, onnx_file in configs:
+        if onnx_file and not os.path.exists(os.path.join(model_dir, onnx_file)):
+            print(f"⚠️ {name} ignoré : {os.path.join(model_dir, onnx_file)} introuvable (voir exportOnnx.py)")
+            continue
+        labels, timings = run_backend(model_dir, backend_name, onnx_file, texts)
+
+        if reference is None:
+            reference = labels
+        token_agreement, exact_agreement = agreement(reference, labels)
+
+        print(f"\n🔧 {name} — accord labels/token {token_agreement:.4%}, séquences identiques {exact_agreement:.2%}")
+        for batch_size, timing in timings.items():
+            print(f"   batch {batch_size:3d} : {timing['texts_per_s']:8.1f} textes/s, {timing['ms_per_batch']:8.2f} ms/batch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import tempfile
+
+from datasets import load_dataset
+from transformers import AutoConfig, AutoModelForTokenClassification, AutoTokenizer, DataCollatorForTokenClassification, Trainer, TrainingArguments
+
+import trainNER
+from sequencePacking import PackedDataCollator, PackedDataset
+from trainingProfile import training_profile
+
+EPOCHS = 1
+
+
+def run_mode(packed, tokenized, tokenizer, label_list, label_to_id, id_to_label, epochs, profile):
+    config = AutoConfig.from_pretrained(
+        trainNER.MODEL_CHECKPOINT, num_labels=len(label_list), id2label=id_to_label, label2id=label_to_id
+    )
+    model = AutoModelForTokenClassification.from_pretrained(trainNER.MODEL_CHECKPOINT, config=config)
+
+    train_dataset = tokenized["train"]
+    if packed:
+        train_dataset = PackedDataset(train_dataset, trainNER.MAX_LENGTH)
+        data_collator = PackedDataCollator(tokenizer)
+    else:
+        data_collator = DataCollatorForTokenClassification(tokenizer)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        trainer = Trainer(
+            model=model,
+            args=TrainingArguments(
+                output_dir=output_dir,
+                learning_rate=2e-5,
+                num_train_epochs=epochs,
+                weight_decay=0.01,
+                per_device_eval_batch_size=16,
+                save_strategy="no",
+                report_to="none",
+                seed=42,
+                **profile
+            ),
+            train_dataset=train_dataset,
+            data_collator=data_collator,
+            compute_metrics=trainNER.build_compute_metrics(label_list),
+            preprocess_logits_for_metrics=trainNER.reduce_logits,
+        )
+        train_metrics = trainer.train().metrics
+        eval_metrics = trainer.evaluate(eval_dataset=tokenized["validation"])
+
+    real_tokens = sum(len(ids) for ids in tokenized["train"]["input_ids"]) * epochs
+    return {
+        "sequences": len(train_dataset),
+        "train_runtime_s": train_metrics["train_runtime"],
+        "tokens_per_s": real_tokens / train_metrics["train_runtime"],
+        "f1": eval_metrics.get("eval_overall_f1"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tokens/s et F1 : entraînement packé vs non packé")
+    parser.add_argument("--epochs", type=float, default=EPOCHS)
+    args = parser.parse_args()
+
+    dataset = load_dataset("json", data_files=trainNER.DATA_FILES, field=None)
+    label_list, label_to_id, id_to_label = trainNER.load_labels()
+    tokenizer = AutoTokenizer.from_pretrained(trainNER.MODEL_CHECKPOINT)
+    tokenized = trainNER.load_tokenized_datasets(dataset, tokenizer, label_to_id)
+    profile = training_profile()
+
+    results = {}
+    for packed in (False, True):
+        results[packed] = run_mode(packed, tokenized, tokenizer, label_list, label_to_id, id_to_label, args.epochs, profile)
+
+    print(f"\n📦 {len(tokenized['train'])} exemples d'entraînement, {args.epochs} epoch(s), F1 sur la validation")
+    for packed, r in results.items():
+        print(
+            f"🔧 {'packé    ' if packed else 'non packé'} : {r['sequences']:6d} séquences, "
+            f"{r['tokens_per_s']:9.1f} tokens/s ({r['train_runtime_s']:.1f} s), F1 {r['f1']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from syntheticFixtures import FIXTURE_DIR, NUM_CARDS, NUM_TAGS, SEED, generate_fixtures, load_meta
+
+STAGES = ("commanders", "merge", "keywords", "annotate", "tokenize", "inference")
+REPORT_FILE = "bench_stages.json"
+EXAMPLES_FILE = "bench_ner_examples.json"  # sortie de l'étape annotate, entrée de tokenize
+INFERENCE_LIMIT = 2000  # textes prédits au plus, l'inférence étant de loin l'étape la plus lente
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def load_raw_entries():
+    import mergeTagsAndComs
+
+    with open(mergeTagsAndComs.OUTPUT_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Chaque étape prépare ses entrées hors chrono puis renvoie (fonction chronométrée, nb d'éléments)
+def stage_commanders(args):
+    import getcoms
+
+    return getcoms.main, load_meta(".")["num_cards"]
+
+
+def stage_merge(args):
+    import mergeTagsAndComs
+
+    return mergeTagsAndComs.main, load_meta(".")["num_cards"]
+
+
+def stage_keywords(args):
+    from cardSource import iter_cards
+    from keywordMatcher import load_matcher
+
+    texts = [f"{card.get('oracle_text', '')}\n{card.get('type_line', '')}".strip() for card in iter_cards()]
+
+    def run():
+        matcher = load_matcher()
+        for text in texts:
+            matcher.match(text)
+
+    return run, len(texts)
+
+
+def stage_annotate(args):
+    import prepareNerData
+
+    entries = load_raw_entries()
+    annotator_args = (prepareNerData.KEYWORD_FILE, prepareNerData.LABEL_LIST_FILE, args.tokenizer)
+
+    def run():
+        examples = list(prepareNerData.annotate_corpus(entries, args.workers, annotator_args=annotator_args))
+        with open(EXAMPLES_FILE, "w", encoding="utf-8") as f:
+            json.dump(examples, f, ensure_ascii=False)
+
+    return run, len(entries)
+
+
+def stage_tokenize(args):
+    from transformers import AutoTokenizer
+
+    import trainNER
+
+    with open(EXAMPLES_FILE, encoding="utf-8") as f:
+        examples = json.load(f)
+    _, label_to_id, _ = trainNER.load_labels()
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+
+    def run():
+        batch_size = trainNER.TOKENIZE_BATCH_SIZE
+        for i in range(0, len(examples), batch_size):
+            batch = examples[i:i + batch_size]
+            trainNER.tokenize_and_align_labels(
+                {"tokens": [e["tokens"] for e in batch], "labels": [e["labels"] for e in batch]}, tokenizer, label_to_id
+            )
+
+    return run, len(examples)
+
+
+def stage_inference(args):
+    import inferenceNERmtgArch
+
+    texts = [entry["text"] for entry in load_raw_entries()[:args.inference_limit]]
+    inferenceNERmtgArch.load_model(args.model_dir, args.backend)
+
+    return (lambda: inferenceNERmtgArch.predict_batch(texts)), len(texts)
+
+
+def run_stage(name, args):
+    run, items = globals()[f"stage_{name}"](args)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    run()
+    wall = time.perf_counter() - start
+    return {
+        "stage": name,
+        "items": items,
+        "wall_s": wall,
+        "items_per_s": items / wall if wall else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_before_mb": rss_before,
+        "children_peak_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline_file):
+    with open(baseline_file, encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {r["stage"]: r for r in baseline["stages"]}
+
+    print(f"\n⚖️ Comparaison avec {baseline_file} (commit {baseline.get('commit')})")
+    for r in report["stages"]:
+        b = before.get(r["stage"])
+        if b is None:
+            continue
+        print(
+            f"   {r['stage']:11} : temps ×{r['wall_s'] / b['wall_s']:.2f}, "
+            f"pic RSS ×{r['peak_rss_mb'] / b['peak_rss_mb']:.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps et pic de RSS de chaque étape du pipeline sur des fixtures synthétiques")
+    parser.add_argument("--fixture-dir", default=FIXTURE_DIR)
+    parser.add_argument("--cards", type=int, default=NUM_CARDS)
+    parser.add_argument("--tags", type=int, default=NUM_TAGS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--tokenizer", default="bert-base-cased")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processus d'annotation")
+    parser.add_argument("--model-dir", default="./ner-archetype-model")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--inference-limit", type=int, default=INFERENCE_LIMIT)
+    parser.add_argument("--report", default=REPORT_FILE)
+    parser.add_argument("--compare", help="rapport JSON d'un autre commit à comparer")
+    parser.add_argument("--stage", choices=STAGES, help="usage interne : une seule étape dans ce processus")
+    args = parser.parse_args()
+
+    if args.stage:
+        print(json.dumps(run_stage(args.stage, args)))
+        return
+
+    fixture_dir = os.path.abspath(args.fixture_dir)
+    try:
+        meta = load_meta(fixture_dir)
+    except FileNotFoundError:
+        meta = None
+    if meta != {"num_cards": args.cards, "num_tags": args.tags, "seed": args.seed}:
+        print(f"🧪 Génération des fixtures ({args.cards} cartes, {args.tags} tags)...")
+        meta = generate_fixtures(fixture_dir, args.cards, args.tags, args.seed)
+
+    stages = [stage for stage in STAGES if stage in args.stages]
+    if "inference" in stages and not os.path.isdir(args.model_dir):
+        print(f"⚠️ Modèle introuvable ({args.model_dir}) : étape inference ignorée")
+        stages.remove("inference")
+
+    # Un sous-processus par étape, lancé dans le dossier des fixtures : les scripts y trouvent
+    # leurs fichiers par défaut, et le pic de RSS d'une étape ne pollue pas la suivante
+    tokenizer = os.path.abspath(args.tokenizer) if os.path.isdir(args.tokenizer) else args.tokenizer
+    results = []
+    for stage in stages:
+        command = [
+            sys.executable, os.path.abspath(__file__), "--stage", stage,
+            "--tokenizer", tokenizer, "--workers", str(args.workers),
+            "--model-dir", os.path.abspath(args.model_dir), "--backend", args.backend,
+            "--inference-limit", str(args.inference_limit),
+        ]
+        output = subprocess.run(command, cwd=fixture_dir, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results.append(result)
+        print(
+            f"🔧 {stage:11} : {result['wall_s']:8.2f} s, {result['items_per_s'] or 0:10.1f} éléments/s, "
+            f"pic RSS {result['peak_rss_mb']:8.1f} Mo (workers {result['children_peak_rss_mb']:.1f} Mo)"
+        )
+
+    report = {"commit": git_commit(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "fixtures": meta, "stages": results}
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Rapport écrit dans {args.report}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,30 @@
-import json
-
-INPUT_FILE = "edhrec_tags_to_cards.json"
-OUTPUT_FILE = "archetype_to_keywords.json"
-
-def main():
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        tag_to_cards = json.load(f)
-
-    archetype_to_keywords = {tag: [] for tag in tag_to_cards.keys()}
-
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(archetype_to_keywords, f, indent=2, ensure_ascii=False)
-
-    print(f"✅ Fichier {OUTPUT_FILE} généré avec {len(archetype_to_keywords)} tags, prêt à remplir à la main.")
-
-if __name__ == "__main__":
-    main()
+import json
+import os
+
+INPUT_FILE = "edhrec_tags_to_cards.json"
+OUTPUT_FILE = "archetype_to_keywords.json"
+
+def main(input_file=INPUT_FILE, output_file=OUTPUT_FILE):
+    with open(input_file, "r", encoding="utf-8") as f:
+        tag_to_cards = json.load(f)
+
+    # Conserver les mots-clés déjà remplis à la main
+    existing = {}
+    if os.path.exists(output_file):
+        with open(output_file, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+
+    archetype_to_keywords = {tag: existing.get(tag, []) for tag in tag_to_cards.keys()}
+
+    dropped = [tag for tag, keywords in existing.items() if keywords and tag not in archetype_to_keywords]
+    if dropped:
+        print(f"⚠️ {len(dropped)} tags absents d'EDHREC retirés avec leurs mots-clés : {dropped}")
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(archetype_to_keywords, f, indent=2, ensure_ascii=False)
+
+    new_tags = sum(1 for tag in archetype_to_keywords if tag not in existing)
+    print(f"✅ Fichier {output_file} généré avec {len(archetype_to_keywords)} tags ({new_tags} nouveaux), prêt à remplir à la main.")
+
+if __name__ == "__main__":
+    main()
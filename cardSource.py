@@ -0,0 +1,143 @@
+import hashlib
+import json
+
+ORACLE_FILE = "oracle-cards-20250404090221.json"
+CARD_FIELDS = ("name", "oracle_text", "type_line", "legalities")
+CHUNK_SIZE = 1 << 20  # caractères lus à chaque remplissage du buffer
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def _scalar_cut(buffer, end):
+    # Vrai si aucun séparateur ne suit le scalaire décodé avant la fin du buffer
+    while end < len(buffer) and buffer[end] not in _DELIMITERS:
+        end += 1
+    return end == len(buffer)
+
+
+def iter_json_array(path, fields=None, chunk_size=CHUNK_SIZE):
+    """
+    Itère sur les éléments du tableau JSON de premier niveau de `path`, un par un,
+    sans jamais charger le fichier entier (dumps Scryfall oracle/default/all-cards).
+
+    Si `fields` est donné, seuls ces champs sont conservés dans chaque dict renvoyé.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        fill()
+        skip_whitespace()
+        if buffer[pos:pos + 1] != "[":
+            raise ValueError(f"{path} : un tableau JSON est attendu au premier niveau")
+        pos += 1
+
+        first = True
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError(f"{path} : fin de fichier inattendue")
+            if buffer[pos] == "]":
+                return
+            if not first:
+                if buffer[pos] != ",":
+                    raise ValueError(f"{path} : ',' attendu à la position {pos}")
+                pos += 1
+                skip_whitespace()
+            first = False
+
+            # Décoder l'élément suivant, en relisant tant qu'il est coupé par la fin du buffer
+            while True:
+                try:
+                    item, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                if not eof and not isinstance(item, (dict, list, str)) and _scalar_cut(buffer, end):
+                    fill()  # nombre ou littéral coupé par la fin du buffer : "-2500." décodé en -2500
+                    continue
+                break
+            pos = end
+
+            if fields is not None and isinstance(item, dict):
+                item = {key: item[key] for key in fields if key in item}
+            yield item
+
+
+def iter_cards(path=ORACLE_FILE, fields=CARD_FIELDS):
+    """Cartes d'un dump Scryfall, projetées par défaut sur `CARD_FIELDS`."""
+    return iter_json_array(path, fields=fields)
+
+
+def card_key(card):
+    """
+    Identifiant stable d'une carte d'un dump à l'autre : son oracle_id, ou son nom pour
+    les rares entrées sans oracle_id au premier niveau (layout reversible_card).
+    """
+    return card.get("oracle_id") or card["name"]
+
+
+def card_hash(card):
+    """Empreinte de ce qui change l'entrée NER d'une carte : nom, texte oracle et type."""
+    digest = hashlib.sha256()
+    for field in ("name", "oracle_text", "type_line"):
+        digest.update(card.get(field, "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class JsonArrayWriter:
+    """
+    Tableau JSON écrit élément par élément dans `f` (qui reste ouvert), avec la mise en forme
+    de `json.dump(..., indent=indent, ensure_ascii=False)`.
+    """
+
+    def __init__(self, f, indent=2):
+        self.f = f
+        self.indent = indent
+        self.pad = " " * indent
+        self.count = 0
+
+    def write(self, item):
+        self.f.write("[\n" if self.count == 0 else ",\n")
+        text = json.dumps(item, indent=self.indent, ensure_ascii=False)
+        self.f.write(self.pad + text.replace("\n", "\n" + self.pad))
+        self.count += 1
+
+    def close(self):
+        self.f.write("\n]" if self.count else "[]")
+        return self.count
+
+
+def dump_json_array(items, f, indent=2):
+    """
+    Écrit un itérable dans `f` au fil de l'eau, avec exactement la même mise en forme
+    que `json.dump(list(items), f, indent=indent, ensure_ascii=False)`.
+    Renvoie le nombre d'éléments écrits.
+    """
+    writer = JsonArrayWriter(f, indent)
+    for item in items:
+        writer.write(item)
+    return writer.close()
@@ -0,0 +1,212 @@
+import json
+import os
+import sys
+from array import array
+
+import numpy as np
+from tqdm import tqdm
+
+from cardSource import CARD_FIELDS, ORACLE_FILE, iter_cards
+from tagIndex import source_matches, source_meta
+
+STORE_DIR = "card_store"
+STRING_COLUMNS = ("name", "oracle_text", "type_line")
+# Les flags sont testés en sous-chaîne de type_line, comme dans getcoms.is_commander
+TYPE_FLAGS = (
+    "Legendary", "Basic", "Snow", "World",
+    "Creature", "Artifact", "Enchantment", "Planeswalker", "Land",
+    "Instant", "Sorcery", "Battle", "Kindred", "Tribal",
+)
+LEGALITY_STATUSES = ("legal", "not_legal", "restricted", "banned")
+
+
+# ====== CONVERSION ======
+
+def build_store(input_file=ORACLE_FILE, store_dir=STORE_DIR):
+    """Convertit un dump Scryfall en store colonnaire (fichiers .npy + meta.json)."""
+    dictionaries = {column: {} for column in STRING_COLUMNS}
+    codes = {column: array("i") for column in STRING_COLUMNS}
+    present = array("B")  # bit i = CARD_FIELDS[i] présent dans la carte
+    type_flags = array("I")
+    formats = []
+    legality_bits = {status: array("Q") for status in LEGALITY_STATUSES}
+
+    for card in tqdm(iter_cards(input_file), desc="🗜️ Conversion"):
+        present.append(sum(1 << i for i, field in enumerate(CARD_FIELDS) if field in card))
+
+        for column in STRING_COLUMNS:
+            values = dictionaries[column]
+            value = card.get(column, "")
+            code = values.get(value)
+            if code is None:
+                code = values[value] = len(values)
+            codes[column].append(code)
+
+        type_line = card.get("type_line", "")
+        type_flags.append(sum(1 << i for i, flag in enumerate(TYPE_FLAGS) if flag in type_line))
+
+        bits = dict.fromkeys(LEGALITY_STATUSES, 0)
+        for fmt, status in card.get("legalities", {}).items():
+            if fmt not in formats:
+                formats.append(fmt)
+            if status in bits:
+                bits[status] |= 1 << formats.index(fmt)
+        for status in LEGALITY_STATUSES:
+            legality_bits[status].append(bits[status])
+
+    if len(formats) > 64:
+        raise ValueError(f"{len(formats)} formats : trop pour un bitmask 64 bits")
+
+    os.makedirs(store_dir, exist_ok=True)
+    for column in STRING_COLUMNS:
+        encoded = [value.encode("utf-8") for value in dictionaries[column]]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded], dtype=np.int64)
+        np.save(os.path.join(store_dir, f"{column}.codes.npy"), np.frombuffer(codes[column], dtype=np.int32))
+        np.save(os.path.join(store_dir, f"{column}.offsets.npy"), offsets)
+        np.save(os.path.join(store_dir, f"{column}.data.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    np.save(os.path.join(store_dir, "present.npy"), np.frombuffer(present, dtype=np.uint8))
+    np.save(os.path.join(store_dir, "type_flags.npy"), np.frombuffer(type_flags, dtype=np.uint32))
+    for status in LEGALITY_STATUSES:
+        np.save(os.path.join(store_dir, f"legalities.{status}.npy"), np.frombuffer(legality_bits[status], dtype=np.uint64))
+
+    meta = {
+        **source_meta(input_file),
+        "count": len(present),
+        "fields": list(CARD_FIELDS),
+        "string_columns": list(STRING_COLUMNS),
+        "type_flags": list(TYPE_FLAGS),
+        "formats": formats,
+        "statuses": list(LEGALITY_STATUSES),
+    }
+    with open(os.path.join(store_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    return meta
+
+
+def is_fresh(store_dir=STORE_DIR, input_file=ORACLE_FILE):
+    """
+    Vrai si le store existe et a été construit à partir du contenu actuel de `input_file`.
+    Sans dump à comparer (`input_file` absent), le store fait foi.
+    """
+    meta_file = os.path.join(store_dir, "meta.json")
+    if not os.path.exists(meta_file):
+        return False
+    if not os.path.exists(input_file):
+        return True
+    with open(meta_file, encoding="utf-8") as f:
+        meta = json.load(f)
+    return source_matches(meta, input_file)
+
+
+# ====== LECTURE ======
+
+class StringColumn:
+    """Colonne de chaînes encodée par dictionnaire : codes int32 + valeurs uniques UTF-8."""
+
+    def __init__(self, store_dir, column):
+        self.codes = np.load(os.path.join(store_dir, f"{column}.codes.npy"), mmap_mode="r")
+        self._offsets = np.load(os.path.join(store_dir, f"{column}.offsets.npy"), mmap_mode="r")
+        self._data = np.load(os.path.join(store_dir, f"{column}.data.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.codes)
+
+    def value(self, code):
+        start, end = self._offsets[code], self._offsets[code + 1]
+        return self._data[start:end].tobytes().decode("utf-8")
+
+    def __getitem__(self, row):
+        return self.value(int(self.codes[row]))
+
+    def values(self):
+        return [self.value(code) for code in range(len(self._offsets) - 1)]
+
+    def where(self, predicate):
+        # Le prédicat n'est évalué qu'une fois par valeur unique, puis projeté sur toutes les lignes
+        table = np.fromiter((predicate(v) for v in self.values()), dtype=bool, count=len(self._offsets) - 1)
+        return table[self.codes]
+
+    def equals(self, value):
+        return self.where(lambda v: v == value)
+
+    def contains(self, substring):
+        return self.where(lambda v: substring in v)
+
+
+class CardStore:
+    def __init__(self, store_dir=STORE_DIR):
+        with open(os.path.join(store_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.columns = {column: StringColumn(store_dir, column) for column in self.meta["string_columns"]}
+        self.present = np.load(os.path.join(store_dir, "present.npy"), mmap_mode="r")
+        self.type_flags = np.load(os.path.join(store_dir, "type_flags.npy"), mmap_mode="r")
+        self.legalities = {
+            status: np.load(os.path.join(store_dir, f"legalities.{status}.npy"), mmap_mode="r")
+            for status in self.meta["statuses"]
+        }
+
+    def __len__(self):
+        return self.meta["count"]
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    # ------ masques booléens sur tout le corpus ------
+
+    def has_type(self, flag):
+        bit = np.uint32(1 << self.meta["type_flags"].index(flag))
+        return (self.type_flags & bit) != 0
+
+    def has_status(self, fmt, status):
+        if fmt not in self.meta["formats"]:
+            return np.zeros(len(self), dtype=bool)
+        bit = np.uint64(1 << self.meta["formats"].index(fmt))
+        return (self.legalities[status] & bit) != 0
+
+    def is_legal(self, fmt):
+        return self.has_status(fmt, "legal")
+
+    def commander_mask(self):
+        # Équivalent vectorisé de getcoms.is_commander
+        return self.has_type("Legendary") & self.has_type("Creature") & self.is_legal("commander")
+
+    # ------ matérialisation ------
+
+    def record(self, row):
+        bits = int(self.present[row])
+        card = {}
+        for i, field in enumerate(self.meta["fields"]):
+            if not bits & (1 << i):
+                continue
+            if field in self.columns:
+                card[field] = self.columns[field][row]
+            elif field == "legalities":
+                card[field] = self._legalities_of(row)
+        return card
+
+    def _legalities_of(self, row):
+        legalities = {}
+        for i, fmt in enumerate(self.meta["formats"]):
+            for status in self.meta["statuses"]:
+                if int(self.legalities[status][row]) & (1 << i):
+                    legalities[fmt] = status
+                    break
+        return legalities
+
+    def records(self, mask):
+        return [self.record(row) for row in np.flatnonzero(mask)]
+
+
+def open_store(store_dir=STORE_DIR):
+    return CardStore(store_dir)
+
+
+if __name__ == "__main__":
+    input_file = sys.argv[1] if len(sys.argv) > 1 else ORACLE_FILE
+    store_dir = sys.argv[2] if len(sys.argv) > 2 else STORE_DIR
+    meta = build_store(input_file, store_dir)
+    print(f"✅ Store {store_dir} généré : {meta['count']} cartes, {len(meta['formats'])} formats.")
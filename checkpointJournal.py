@@ -0,0 +1,128 @@
+import json
+import os
+
+FSYNC_EVERY = 20  # enregistrements entre deux fsync du journal
+
+
+def read_journal(journal_file):
+    """
+    Enregistrements (clé, valeur) valides du journal et la taille en octets qu'ils occupent,
+    sans rien modifier : la lecture s'arrête à la première ligne tronquée ou illisible.
+    """
+    records = []
+    valid_end = 0
+    if not os.path.exists(journal_file):
+        return records, valid_end
+
+    with open(journal_file, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # écriture interrompue en plein milieu
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            records.append((record["key"], record["value"]))
+            valid_end += len(line)
+    return records, valid_end
+
+
+def load_checkpoint(snapshot_file, journal_file=None):
+    """Données du snapshot avec le journal rejoué, en lecture seule (rien n'est créé ni tronqué)."""
+    data = {}
+    if os.path.exists(snapshot_file):
+        with open(snapshot_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    records, _ = read_journal(journal_file or f"{snapshot_file}.journal")
+    data.update(records)
+    return data
+
+
+class CheckpointJournal:
+    """
+    Cache clé -> valeur d'un scraper, persistant en O(n) octets écrits.
+
+    Chaque élément terminé est ajouté au journal JSONL (`<snapshot>.journal`), avec un
+    fsync périodique. Au démarrage, le snapshot JSON est chargé puis le journal rejoué ;
+    une dernière ligne tronquée par un crash est ignorée. `compact()` réécrit le
+    snapshot de façon atomique et vide le journal.
+    """
+
+    def __init__(self, snapshot_file, journal_file=None, fsync_every=FSYNC_EVERY):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file or f"{snapshot_file}.journal"
+        self.fsync_every = fsync_every
+        self.data = {}
+        self._pending = 0
+
+        if os.path.exists(snapshot_file):
+            with open(snapshot_file, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+
+        self.replayed = self._replay()
+        self._journal = open(self.journal_file, "a", encoding="utf-8")
+
+    def _replay(self):
+        if not os.path.exists(self.journal_file):
+            return 0
+
+        records, valid_end = read_journal(self.journal_file)
+        self.data.update(records)
+
+        # Couper la fin corrompue pour que les prochains ajouts repartent d'une ligne saine
+        if valid_end != os.path.getsize(self.journal_file):
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(valid_end)
+        return len(records)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def record(self, key, value):
+        self.data[key] = value
+        self._journal.write(json.dumps({"key": key, "value": value}, ensure_ascii=False) + "\n")
+        self._journal.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._pending = 0
+
+    def compact(self):
+        tmp_file = f"{self.snapshot_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+        # Le snapshot contient tout : le journal peut repartir de zéro
+        self._journal.truncate(0)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._pending = 0
+
+    def close(self, compact=True):
+        if compact:
+            self.compact()
+        else:
+            self.sync()
+        self._journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
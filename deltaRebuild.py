@@ -0,0 +1,143 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from cardSource import ORACLE_FILE, card_hash, card_key, iter_cards
+from keywordMatcher import KeywordMatcher
+from mergeTagsAndComs import KEYWORD_FILE, MERGE_FIELDS, OUTPUT_FILE as RAW_FILE, TAGS_FILE, build_card_name_to_tags, tag_card
+from prepareNerData import LABEL_LIST_FILE, SPLIT_FILES, annotate_corpus, assign_split, save_examples, save_shards
+
+MANIFEST_FILE = "ner_manifest.json"
+DELTA_WORKERS = 4  # l'annotation d'un delta porte sur quelques centaines de cartes au plus
+
+
+def tagging_fingerprint(tags_file=TAGS_FILE, keyword_file=KEYWORD_FILE, label_list_file=LABEL_LIST_FILE):
+    # Si l'un de ces fichiers change, les tags de toutes les cartes peuvent changer
+    digest = hashlib.sha256()
+    for path in (tags_file, keyword_file, label_list_file):
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_atomic(examples, path):
+    tmp_path = path + ".tmp"
+    save_examples(examples, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_manifest(source, cards, manifest_file=MANIFEST_FILE):
+    manifest = {"source": os.path.basename(source), "tagging": tagging_fingerprint(), "cards": cards}
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_file, manifest_file)
+
+
+def init_manifest(cards_file=ORACLE_FILE, manifest_file=MANIFEST_FILE):
+    """
+    Manifest initial : empreinte de chaque carte du dump qui a produit les splits actuels,
+    et le split où se trouve son exemple (None si la carte n'a donné aucune entrée).
+    """
+    split_of = {}
+    for split, path in SPLIT_FILES.items():
+        for example in load_json(path):
+            if "oracle_id" not in example:
+                sys.exit(f"❌ {path} n'a pas d'oracle_id : relancer mergeTagsAndComs.py puis prepareNerData.py")
+            split_of[example["oracle_id"]] = split
+
+    cards = {}
+    for card in iter_cards(cards_file, MERGE_FIELDS):
+        key = card_key(card)
+        cards[key] = [card_hash(card), split_of.get(key)]
+
+    save_manifest(cards_file, cards, manifest_file)
+    print(f"✅ Manifest créé : {len(cards)} cartes, {len(split_of)} exemples")
+
+
+def diff_dump(cards_file, previous):
+    """Renvoie (cartes ajoutées ou modifiées, clés supprimées, nouvelles empreintes)."""
+    touched = []
+    hashes = {}
+    for card in iter_cards(cards_file, MERGE_FIELDS):
+        key = card_key(card)
+        hashes[key] = card_hash(card)
+        old = previous.get(key)
+        if old is None or old[0] != hashes[key]:
+            touched.append(card)
+    removed = [key for key in previous if key not in hashes]
+    return touched, removed, hashes
+
+
+def apply_delta(cards_file, manifest_file=MANIFEST_FILE, num_workers=DELTA_WORKERS):
+    manifest = load_json(manifest_file)
+    if manifest["tagging"] != tagging_fingerprint():
+        sys.exit("❌ Tags, mots-clés ou labels modifiés depuis le manifest : reconstruction complète nécessaire")
+
+    previous = manifest["cards"]
+    touched, removed, hashes = diff_dump(cards_file, previous)
+    added = sum(1 for card in touched if card_key(card) not in previous)
+    print(f"🔍 {manifest['source']} → {os.path.basename(cards_file)} : "
+          f"{added} ajoutées, {len(touched) - added} modifiées, {len(removed)} supprimées")
+
+    # Re-tagger puis ré-annoter uniquement les cartes touchées
+    card_name_to_tags = build_card_name_to_tags(load_json(TAGS_FILE))
+    keyword_matcher = KeywordMatcher(load_json(KEYWORD_FILE))
+    entries = [entry for entry in (tag_card(card, card_name_to_tags, keyword_matcher) for card in touched) if entry]
+    examples = list(annotate_corpus(entries, num_workers=min(num_workers, max(1, len(entries) // 100))))
+
+    # Une carte déjà présente garde son split ; une nouvelle prend celui de son hash
+    stale = {card_key(card) for card in touched} | set(removed)
+    new_by_split = {split: [] for split in SPLIT_FILES}
+    split_of = {}
+    for example in examples:
+        key = example["oracle_id"]
+        split = (previous.get(key) or [None, None])[1] or assign_split(key)
+        new_by_split[split].append(example)
+        split_of[key] = split
+
+    splits = {}
+    for split, path in SPLIT_FILES.items():
+        kept = [example for example in load_json(path) if example["oracle_id"] not in stale]
+        splits[split] = kept + new_by_split[split]
+        write_atomic(splits[split], path)
+        print(f"💾 {path} : {len(splits[split])} exemples ({len(new_by_split[split])} réécrits)")
+    save_shards(splits)  # simple conversion tokens → ids, sans ré-annotation
+
+    if os.path.exists(RAW_FILE):
+        raw = [entry for entry in load_json(RAW_FILE) if entry.get("oracle_id") not in stale]
+        write_atomic(raw + entries, RAW_FILE)
+
+    cards = {
+        key: [card_hash_value, split_of.get(key) if key in stale else previous[key][1]]
+        for key, card_hash_value in hashes.items()
+    }
+    save_manifest(cards_file, cards, manifest_file)
+    print(f"✅ Delta appliqué : {len(examples)} exemples ré-annotés")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Met à jour les splits NER à partir d'un nouveau dump Scryfall, sans tout reconstruire")
+    parser.add_argument("cards_file", nargs="?", default=ORACLE_FILE, help="nouveau dump oracle-cards")
+    parser.add_argument("--init", action="store_true", help="crée le manifest à partir du dump qui a produit les splits actuels")
+    parser.add_argument("--manifest", default=MANIFEST_FILE)
+    parser.add_argument("--workers", type=int, default=DELTA_WORKERS)
+    args = parser.parse_args()
+
+    if args.init:
+        init_manifest(args.cards_file, args.manifest)
+    elif not os.path.exists(args.manifest):
+        sys.exit(f"❌ {args.manifest} introuvable : lancer d'abord --init avec le dump qui a produit les splits actuels")
+    else:
+        apply_delta(args.cards_file, args.manifest, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import queue
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.chrome import ChromeDriverManager
+
+MAX_PAGES_PER_DRIVER = 50  # pages servies avant de relancer un navigateur
+
+
+class DriverPool:
+    """
+    Pool de navigateurs Chrome headless lancés une seule fois et prêtés aux workers.
+
+    Entre deux pages, l'état du navigateur est remis à zéro (cookies, storage, about:blank).
+    Un navigateur est recyclé après `max_pages` pages, ou immédiatement s'il plante.
+    """
+
+    def __init__(self, size, options, max_pages=MAX_PAGES_PER_DRIVER):
+        self.options = options
+        self.max_pages = max_pages
+        self.driver_path = ChromeDriverManager().install()  # une seule fois pour tout le pool
+        self._idle = queue.Queue()
+        self._slots = []
+
+        for _ in range(size):
+            slot = {"driver": self._launch(), "pages": 0}
+            self._slots.append(slot)
+            self._idle.put(slot)
+
+    def _launch(self):
+        return webdriver.Chrome(service=ChromeService(self.driver_path), options=self.options)
+
+    def _recycle(self, slot):
+        try:
+            slot["driver"].quit()
+        except Exception:
+            pass  # navigateur déjà mort
+        slot["driver"] = self._launch()
+        slot["pages"] = 0
+
+    @staticmethod
+    def _reset(driver):
+        driver.delete_all_cookies()
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        driver.get("about:blank")
+
+    @contextmanager
+    def driver(self):
+        slot = self._idle.get()
+        try:
+            yield slot["driver"]
+            slot["pages"] += 1
+            if slot["pages"] >= self.max_pages:
+                self._recycle(slot)
+            else:
+                try:
+                    self._reset(slot["driver"])
+                except WebDriverException:
+                    self._recycle(slot)
+        except WebDriverException:
+            self._recycle(slot)
+            raise
+        finally:
+            self._idle.put(slot)
+
+    def close(self):
+        for slot in self._slots:
+            try:
+                slot["driver"].quit()
+            except Exception:
+                pass
+        self._slots = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
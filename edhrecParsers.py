@@ -0,0 +1,104 @@
+import re
+from urllib.parse import urljoin
+
+import lxml.html
+from bs4 import BeautifulSoup
+
+BASE_URL = "https://edhrec.com"
+
+
+def parse_tag_list(html):
+    soup = BeautifulSoup(html, "html.parser")
+
+    tag_entries = soup.select("div.Card_container__Ng56K")
+    tags = []
+
+    for entry in tag_entries:
+        name_span = entry.select_one("div.CardLabel_label__iAM7T")
+        if not name_span:
+            continue
+        # Voici une exemple du contenu du span 184367 Artifacts decks il faut extraire le nom du tag
+        tag_name = re.sub(r"^\d+\s+|\s+decks$", "", name_span.text.strip().lower())
+        link_a = f"/tags/{tag_name.replace(' ', '-')}"
+        tags.append({"name": tag_name, "url": urljoin(BASE_URL, link_a)})
+
+    return tags
+
+
+def parse_tag_cards(html):
+    soup = BeautifulSoup(html, "html.parser")
+
+    card_names = [span.get_text(strip=True) for span in soup.select('span[class^="Card_name"]')]
+    return list(set(card_names))  # remove duplicates
+
+
+def parse_commander_tags(html, threshold):
+    soup = BeautifulSoup(html, "html.parser")
+
+    tags = []
+    for tag_span in soup.find_all("span", class_="me-4"):
+        count_span = tag_span.find_next_sibling("span")
+        if not count_span:
+            continue
+
+        try:
+            count_text = count_span.get_text(strip=True).replace(",", "")
+            count = int(re.sub(r"[^\d]", "", count_text))
+            if count > threshold:
+                tags.append(tag_span.get_text(strip=True))
+        except ValueError:
+            continue
+
+    return list(set(tags))
+
+
+# ====== PARSERS RAPIDES (re-parse de l'archive, voir reparse.py) ======
+# Mêmes sélecteurs que ci-dessus, traduits en XPath et évalués par lxml (en C) :
+# seuls les nœuds ciblés sont convertis en objets Python.
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+TAG_LIST_XPATH = f"//div[{_has_class('Card_container__Ng56K')}]"
+TAG_LABEL_XPATH = f".//div[{_has_class('CardLabel_label__iAM7T')}]"
+CARD_NAME_XPATH = "//span[starts-with(@class, 'Card_name')]"
+COMMANDER_TAG_XPATH = f"//span[{_has_class('me-4')}]"
+
+
+def _text(element, strip=False):
+    # Équivalents de get_text() / get_text(strip=True) de BeautifulSoup
+    if strip:
+        return "".join(text.strip() for text in element.itertext())
+    return "".join(element.itertext())
+
+
+def parse_tag_list_fast(html):
+    tags = []
+    for entry in lxml.html.fromstring(html).xpath(TAG_LIST_XPATH):
+        labels = entry.xpath(TAG_LABEL_XPATH)
+        if not labels:
+            continue
+        tag_name = re.sub(r"^\d+\s+|\s+decks$", "", _text(labels[0]).strip().lower())
+        link_a = f"/tags/{tag_name.replace(' ', '-')}"
+        tags.append({"name": tag_name, "url": urljoin(BASE_URL, link_a)})
+    return tags
+
+
+def parse_tag_cards_fast(html):
+    card_names = [_text(span, strip=True) for span in lxml.html.fromstring(html).xpath(CARD_NAME_XPATH)]
+    return list(set(card_names))
+
+
+def parse_commander_tags_fast(html, threshold):
+    tags = []
+    for tag_span in lxml.html.fromstring(html).xpath(COMMANDER_TAG_XPATH):
+        count_span = tag_span.xpath("following-sibling::span[1]")
+        if not count_span:
+            continue
+
+        count_text = _text(count_span[0], strip=True).replace(",", "")
+        digits = re.sub(r"[^\d]", "", count_text)
+        if digits and int(digits) > threshold:
+            tags.append(_text(tag_span, strip=True))
+
+    return list(set(tags))
@@ -0,0 +1,62 @@
+import argparse
+import os
+
+import torch
+from transformers import AutoTokenizer, AutoModelForTokenClassification
+
+from inferenceNERmtgArch import MODEL_DIR, ONNX_FILE
+
+OUTPUT_DIR = "./ner-archetype-model-onnx"
+QUANTIZED_FILE = "model.int8.onnx"
+OPSET = 17
+
+
+def export_onnx(model_dir=MODEL_DIR, output_dir=OUTPUT_DIR, quantize=False, opset=OPSET):
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForTokenClassification.from_pretrained(model_dir)
+    model.eval()
+
+    os.makedirs(output_dir, exist_ok=True)
+    onnx_path = os.path.join(output_dir, ONNX_FILE)
+
+    # Axes batch et séquence dynamiques : le padding reste calé sur le plus long texte du lot
+    dummy = tokenizer(["Whenever a creature dies, draw a card.", "Flying"], return_tensors="pt", padding=True)
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy["input_ids"], dummy["attention_mask"], dummy["token_type_ids"]),
+            onnx_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    print(f"✅ Modèle ONNX exporté : {onnx_path}")
+
+    # Config et tokenizer à côté du .onnx : le dossier se charge comme le modèle PyTorch
+    model.config.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = os.path.join(output_dir, QUANTIZED_FILE)
+        quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+        print(f"✅ Modèle quantifié int8 : {quantized_path}")
+
+    return output_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export ONNX (option int8) du modèle NER d'archétypes")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--quantize", action="store_true", help="quantification dynamique int8 des poids")
+    parser.add_argument("--opset", type=int, default=OPSET)
+    args = parser.parse_args()
+
+    export_onnx(args.model_dir, args.output_dir, args.quantize, args.opset)
@@ -1,93 +1,87 @@
-import requests
-from bs4 import BeautifulSoup
-import time
-import random
-import re
-from urllib.parse import urljoin
-from tqdm import tqdm
-import json
-import os
-
-BASE_URL = "https://edhrec.com"
-TAGS_URL = f"{BASE_URL}/tags"
-CACHE_FILE = "edhrec_tags_to_cards.json"
-PAUSE_RANGE = (3.0, 6.0)  # Repos entre les requêtes pour éviter d'être bloqué
-
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-}
-
-def get_all_tags():
-    print("🔍 Récupération des tags depuis edhrec.com/tags...")
-    response = requests.get(TAGS_URL, headers=HEADERS)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    tag_entries = soup.select("div.Card_container__Ng56K")
-    print(f"✅ {len(tag_entries)} tags trouvés.")
-    tags = []
-
-    for entry in tag_entries:
-        name_span = entry.select_one("div.CardLabel_label__iAM7T")
-        # Voici une exemple du contenu du span 184367 Artifacts decks il faut extraire le nom du tag
-        tag_name = re.sub(r"^\d+\s+|\s+decks$", "", name_span.text.strip().lower())
-        print(f"✅ {tag_name} tags")
-        link_a = f"/tags/{tag_name.replace(' ', '-')}"
-        print(f"✅ {link_a} link")
-
-        if name_span and link_a:
-            tag_name = tag_name
-            tag_url = urljoin(BASE_URL, link_a)
-            tags.append({"name": tag_name, "url": tag_url})
-
-    return tags
-
-def extract_card_names_from_tag_url(tag_url):
-    response = requests.get(tag_url, headers=HEADERS)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    card_names = [span.get_text(strip=True) for span in soup.select('span[class^="Card_name"]')]
-    print(f"✅ {len(card_names)} card_names")
-    return list(set(card_names))  # remove duplicates
-
-
-def main():
-    # Charger le cache s'il existe
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            tag_map = json.load(f)
-    else:
-        tag_map = {}
-
-    tags = get_all_tags()
-    print(f"✅ {len(tags)} tags trouvés.")
-
-    for tag in tqdm(tags, desc="🔄 Traitement des tags"):
-        tag_name = tag["name"]
-        tag_url = tag["url"]
-        print(f"🔄 Traitement de {tag_name}...")
-
-        # Sauter les tags déjà traités
-        if tag_name in tag_map:
-            continue
-        try:
-            cards = extract_card_names_from_tag_url(tag_url)
-            tag_map[tag_name] = cards
-            # print(f"✅ {tag_name} → {len(cards)} cartes")
-        except Exception as e:
-            print(f"[Erreur] {tag_name} → {e}")
-
-        # Sauvegarder après chaque tag
-        with open(CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(tag_map, f, indent=2, ensure_ascii=False)
-
-        # Pause "humaine"
-        pause = random.uniform(*PAUSE_RANGE)
-        print(f"   ⏸️ Pause de {pause:.1f} secondes...\n")
-        time.sleep(pause)
-
-    print(f"📦 Terminé. Fichier sauvegardé dans {CACHE_FILE}")
-
-if __name__ == "__main__":
-    main()
+import asyncio
+from tqdm.asyncio import tqdm
+import json
+import os
+
+from asyncFetcher import AsyncFetcher
+from checkpointJournal import CheckpointJournal
+from edhrecParsers import BASE_URL, parse_tag_cards, parse_tag_list
+from pageArchive import PageArchive
+
+TAGS_URL = f"{BASE_URL}/tags"
+CACHE_FILE = "edhrec_tags_to_cards.json"
+VALIDATORS_FILE = "edhrec_tags_validators.json"  # ETag / Last-Modified de chaque page de tag
+RATE = 0.25  # requêtes par seconde, pour éviter d'être bloqué
+CONCURRENCY = 4
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+}
+
+def load_json(path):
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+def save_json(path, data):
+    # Écriture atomique : un arrêt en pleine écriture ne laisse pas un fichier tronqué
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+async def get_all_tags(fetcher, archive):
+    print("🔍 Récupération des tags depuis edhrec.com/tags...")
+    result = await fetcher.fetch(TAGS_URL, conditional=False)
+    archive.put(TAGS_URL, result["text"], "tag_list")
+    tags = parse_tag_list(result["text"])
+    print(f"✅ {len(tags)} tags trouvés.")
+    return tags
+
+async def crawl(tag_map, validators, archive):
+    async with AsyncFetcher(headers=HEADERS, rate=RATE, concurrency=CONCURRENCY, validators=validators) as fetcher:
+        tags = await get_all_tags(fetcher, archive)
+
+        # Les tags déjà en cache ne sont revérifiés que si on a de quoi faire une requête conditionnelle
+        url_to_tag = {
+            tag["url"]: tag["name"] for tag in tags
+            if tag["name"] not in tag_map or tag["url"] in validators
+        }
+        print(f"➡️ {len(url_to_tag)} pages de tags à vérifier ({len(tag_map)} tags déjà en cache)")
+
+        # Requête conditionnelle seulement pour un tag déjà en cache : un 304 sur un tag absent le perdrait
+        cached_urls = {url for url, tag_name in url_to_tag.items() if tag_name in tag_map}
+        results = fetcher.fetch_all(url_to_tag, conditional=cached_urls)
+        async for result in tqdm(results, total=len(url_to_tag), desc="🔄 Traitement des tags"):
+            tag_name = url_to_tag[result["url"]]
+
+            if "error" in result:
+                print(f"[Erreur] {tag_name} → {result['error']}")
+                continue
+            if result["not_modified"]:
+                continue  # Page inchangée depuis le dernier crawl
+
+            # Page brute archivée : reparse.py peut reconstruire le cache sans réseau
+            archive.put(result["url"], result["text"], "tag", key=tag_name)
+
+            # Ajouter le tag au journal (une ligne JSONL, pas de réécriture du cache)
+            tag_map.record(tag_name, parse_tag_cards(result["text"]))
+            fetcher.commit(result)  # validator gardé seulement une fois le tag enregistré
+
+        print(f"📊 {fetcher.stats}")
+
+def main():
+    # Charger le cache s'il existe et rejouer le journal d'un crawl interrompu
+    validators = load_json(VALIDATORS_FILE)
+
+    with CheckpointJournal(CACHE_FILE) as tag_map, PageArchive() as archive:
+        try:
+            asyncio.run(crawl(tag_map, validators, archive))
+        finally:
+            save_json(VALIDATORS_FILE, validators)
+
+    print(f"📦 Terminé. Fichier sauvegardé dans {CACHE_FILE}")
+
+if __name__ == "__main__":
+    main()
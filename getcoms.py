@@ -1,29 +1,41 @@
-import json
-
-# Charger les données Scryfall dump (bulk file)
-with open("oracle-cards-20250404090221.json", encoding="utf-8") as f:
-    cards = json.load(f)
-
-# Fonction pour filtrer les commandants
-def is_commander(card):
-    # Exclure les cartes sans types
-    if not card.get("type_line"):
-        return False
-
-    # Inclure uniquement les créatures légendaires
-    is_legendary = "Legendary" in card["type_line"]
-    is_creature = "Creature" in card["type_line"]
-
-    # Vérifie la légalité Commander
-    legal_commander = card.get("legalities", {}).get("commander") == "legal"
-
-    return is_legendary and is_creature and legal_commander
-
-# Appliquer le filtre
-commanders = [card for card in cards if is_commander(card)]
-
-# Sauvegarder le résultat
-with open("filtered_commanders.json", "w", encoding="utf-8") as f:
-    json.dump(commanders, f, indent=2, ensure_ascii=False)
-
-print(f"{len(commanders)} commandants potentiels trouvés.")
\ No newline at end of file
+import os
+
+from cardSource import ORACLE_FILE, dump_json_array, iter_cards
+from cardStore import STORE_DIR, is_fresh, open_store
+
+OUTPUT_FILE = "filtered_commanders.json"
+
+# Fonction pour filtrer les commandants
+def is_commander(card):
+    # Exclure les cartes sans types
+    if not card.get("type_line"):
+        return False
+
+    # Inclure uniquement les créatures légendaires
+    is_legendary = "Legendary" in card["type_line"]
+    is_creature = "Creature" in card["type_line"]
+
+    # Vérifie la légalité Commander
+    legal_commander = card.get("legalities", {}).get("commander") == "legal"
+
+    return is_legendary and is_creature and legal_commander
+
+def main(input_file=ORACLE_FILE, output_file=OUTPUT_FILE, store_dir=STORE_DIR):
+    if is_fresh(store_dir, input_file):
+        # Store colonnaire (cardStore.py) : filtre vectorisé sur tout le corpus
+        store = open_store(store_dir)
+        commanders = store.records(store.commander_mask())
+    else:
+        if os.path.isdir(store_dir):
+            print(f"⚠️ {store_dir} ne correspond pas à {input_file} : lecture du dump (relancer cardStore.py)")
+        # Lire le dump Scryfall (bulk file) carte par carte et appliquer le filtre
+        commanders = (card for card in iter_cards(input_file) if is_commander(card))
+
+    # Sauvegarder le résultat au fil de l'eau
+    with open(output_file, "w", encoding="utf-8") as f:
+        count = dump_json_array(commanders, f)
+
+    print(f"{count} commandants potentiels trouvés.")
+
+if __name__ == "__main__":
+    main()
@@ -1,115 +1,108 @@
-import json
-import time
-import random
-import os
-import urllib.parse
-import re
-
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-
-# ====== CONFIG ======
-INPUT_FILE = "filtered_commanders.json"
-CACHE_FILE = "commander_tags.json"
-PAUSE_RANGE = (3.0, 6.0)  # pause entre chaque commandeur
-TAG_THRESHOLD = 5  # nombre min. de decks pour inclure un tag
-
-# ====== SELENIUM SETUP ======
-chrome_options = Options()
-chrome_options.binary_location = "/mnt/c/Program Files/Google/Chrome/Application/chrome.exe"
-chrome_options.add_argument("--headless=new")  # ✅ safer for WSL
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-
-def format_name_for_url(name):
-    return urllib.parse.quote(name.lower().replace(" ", "-").replace(",", "").replace("'", "").replace("!", ""))
-
-def fetch_edhrec_tags(commander_name):
-    formatted_name = format_name_for_url(commander_name)
-    url = f"https://edhrec.com/commanders/{formatted_name}"
-
-    try:
-        driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
-        driver.get(url)
-        wait = WebDriverWait(driver, 10)
-
-        # Clic sur "More Tags..."
-        try:
-            input_field = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[placeholder="More Tags..."]')))
-            input_field.click()
-            time.sleep(1.5)
-        except:
-            print(f"[!] Pas de champ 'More Tags' pour {commander_name}")
-            driver.quit()
-            return []
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        driver.quit()
-
-        tags = []
-
-        print(soup.find_all("span", class_="me-4")[:5])  # Affiche les 5 premiers span
-        
-        tag_spans = soup.find_all("span", class_="me-4")
-        for tag_span in tag_spans:
-            count_span = tag_span.find_next_sibling("span")
-            if not count_span:
-                continue
-
-            try:
-                count_text = count_span.get_text(strip=True).replace(",", "")
-                count = int(re.sub(r"[^\d]", "", count_text))
-                if count > TAG_THRESHOLD:
-                    tags.append(tag_span.get_text(strip=True))
-            except ValueError:
-                continue
-
-        return list(set(tags))
-
-    except Exception as e:
-        print(f"[Erreur Selenium] {commander_name} : {e}")
-        return []
-
-# ====== SCRIPT PRINCIPAL ======
-
-# Charger les commandants
-with open(INPUT_FILE, encoding="utf-8") as f:
-    commanders = json.load(f)
-
-# Charger le cache si présent
-if os.path.exists(CACHE_FILE):
-    with open(CACHE_FILE, encoding="utf-8") as f:
-        cache = json.load(f)
-else:
-    cache = {}
-
-# Filtrer les commandants déjà traités
-remaining = [c for c in commanders if c["name"] not in cache]
-print(f"➡️ {len(remaining)} commandants à traiter ({len(cache)} déjà en cache)")
-
-# Scraping en mode "safe"
-for i, card in enumerate(remaining, 1):
-    name = card["name"]
-    print(f"[{i}/{len(remaining)}] Traitement de {name}...")
-
-    tags = fetch_edhrec_tags(name)
-    cache[name] = tags
-
-    print(f"   → {tags}")
-    
-    # Sauvegarder après chaque carte (résilient)
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=2, ensure_ascii=False)
-
-    # Pause entre les requêtes
-    pause = random.uniform(*PAUSE_RANGE)
-    print(f"   ⏸️ Pause de {pause:.2f} sec\n")
-    time.sleep(pause)
-
-print("✅ Scraping terminé et sauvegardé dans commander_tags.json.")
+import json
+import time
+import random
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from checkpointJournal import CheckpointJournal
+from driverPool import DriverPool
+from edhrecParsers import parse_commander_tags
+from pageArchive import PageArchive
+
+# ====== CONFIG ======
+INPUT_FILE = "filtered_commanders.json"
+CACHE_FILE = "commander_tags.json"
+PAUSE_RANGE = (3.0, 6.0)  # pause entre chaque commandeur, par navigateur
+NUM_BROWSERS = 4  # navigateurs Chrome gardés ouverts en parallèle
+TAG_THRESHOLD = 5  # nombre min. de decks pour inclure un tag
+
+# ====== SELENIUM SETUP ======
+chrome_options = Options()
+chrome_options.binary_location = "/mnt/c/Program Files/Google/Chrome/Application/chrome.exe"
+chrome_options.add_argument("--headless=new")  # ✅ safer for WSL
+chrome_options.add_argument("--no-sandbox")
+chrome_options.add_argument("--disable-dev-shm-usage")
+
+def format_name_for_url(name):
+    return urllib.parse.quote(name.lower().replace(" ", "-").replace(",", "").replace("'", "").replace("!", ""))
+
+def fetch_edhrec_tags(commander_name, pool, archive=None):
+    formatted_name = format_name_for_url(commander_name)
+    url = f"https://edhrec.com/commanders/{formatted_name}"
+
+    try:
+        with pool.driver() as driver:
+            driver.get(url)
+            wait = WebDriverWait(driver, 10)
+
+            # Clic sur "More Tags..."
+            try:
+                input_field = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[placeholder="More Tags..."]')))
+                input_field.click()
+                time.sleep(1.5)
+            except TimeoutException:
+                print(f"[!] Pas de champ 'More Tags' pour {commander_name}")
+                if archive is not None:
+                    archive.put(url, driver.page_source, "commander", key=commander_name, more_tags=False)
+                return []
+
+            page_source = driver.page_source
+
+        # Page brute archivée (après le clic) : reparse.py peut reconstruire le cache sans réseau
+        if archive is not None:
+            archive.put(url, page_source, "commander", key=commander_name)
+        return parse_commander_tags(page_source, TAG_THRESHOLD)
+
+    except Exception as e:
+        print(f"[Erreur Selenium] {commander_name} : {e}")
+        return []
+
+def fetch_with_pause(commander_name, pool, archive=None):
+    tags = fetch_edhrec_tags(commander_name, pool, archive)
+
+    # Pause entre les requêtes, propre à chaque navigateur
+    pause = random.uniform(*PAUSE_RANGE)
+    time.sleep(pause)
+    return tags
+
+# ====== SCRIPT PRINCIPAL ======
+
+def main():
+    # Charger les commandants
+    with open(INPUT_FILE, encoding="utf-8") as f:
+        commanders = json.load(f)
+
+    # Charger le cache si présent (snapshot + journal d'un scraping interrompu)
+    with CheckpointJournal(CACHE_FILE) as cache, PageArchive() as archive:
+        # Filtrer les commandants déjà traités
+        remaining = [c for c in commanders if c["name"] not in cache]
+        print(f"➡️ {len(remaining)} commandants à traiter ({len(cache)} déjà en cache)")
+
+        # Scraping en parallèle, un worker par navigateur du pool
+        with DriverPool(NUM_BROWSERS, chrome_options) as pool:
+            executor = ThreadPoolExecutor(max_workers=NUM_BROWSERS)
+            try:
+                futures = {executor.submit(fetch_with_pause, card["name"], pool, archive): card["name"] for card in remaining}
+
+                for i, future in enumerate(as_completed(futures), 1):
+                    name = futures[future]
+                    tags = future.result()
+
+                    # Ajouter au journal après chaque carte (résilient, sans réécrire tout le cache)
+                    cache.record(name, tags)
+
+                    print(f"[{i}/{len(remaining)}] {name} → {tags}")
+            finally:
+                # Ctrl-C ou erreur : abandonner les commandants en attente, seuls ceux en cours se terminent
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    print("✅ Scraping terminé et sauvegardé dans commander_tags.json.")
+
+if __name__ == "__main__":
+    main()
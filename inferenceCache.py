@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import inferenceNERmtgArch
+from cardSource import iter_json_array
+
+CACHE_DB = "inference_cache.sqlite"
+DATASET_FILE = "ner_dataset_raw.json"
+MAX_ENTRIES = 100_000  # résultats gardés dans le LRU en mémoire
+MODEL_FILES = ("config.json", "tokenizer.json", "vocab.txt", "model.safetensors", "pytorch_model.bin")
+
+
+def normalize_text(text):
+    # Même texte pour le modèle à des espaces près : NFC + espaces blancs fusionnés
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def rebase_result(result, text):
+    """
+    Résultat calculé sur un texte de même forme normalisée → mêmes labels, offsets recalés sur
+    `text`. None si les textes diffèrent par autre chose que des espaces (le modèle doit tourner).
+    """
+    if result["text"] == text:
+        return result
+
+    tokens = []
+    cursor = 0
+    for token in result["tokens"]:
+        surface = result["text"][token["start"]:token["end"]]
+        start = text.find(surface, cursor)
+        if start < 0 or text[cursor:start].strip():
+            return None
+        cursor = start + len(surface)
+        tokens.append({**token, "start": start, "end": cursor})
+
+    return {
+        "text": text,
+        "tokens": tokens,
+        "spans": inferenceNERmtgArch.decode_spans(text, tokens),
+        "archetypes": result["archetypes"],
+    }
+
+
+def model_revision(model_dir=inferenceNERmtgArch.MODEL_DIR, backend_name=inferenceNERmtgArch.BACKEND,
+                   onnx_file=inferenceNERmtgArch.ONNX_FILE):
+    """
+    Empreinte du modèle servi : backend, contenu de la config, taille et date des poids et du
+    tokenizer. En ONNX, seul le fichier choisi compte (model.onnx et model.int8.onnx cohabitent).
+    """
+    files = MODEL_FILES
+    if backend_name == "onnx":
+        files += (onnx_file, f"{onnx_file}.data")  # poids externes de torch.onnx.export
+    digest = hashlib.sha256(backend_name.encode("utf-8"))
+    for name in files:
+        path = os.path.join(model_dir, name)
+        if not os.path.exists(path):
+            continue
+        digest.update(name.encode("utf-8"))
+        if name == "config.json":
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        else:
+            stat = os.stat(path)
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class InferenceCache:
+    """
+    Cache adressé par contenu : clé = sha256(révision du modèle + texte normalisé).
+    Un LRU en mémoire borné à `max_entries`, et optionnellement un tier SQLite qui
+    survit aux redémarrages.
+    """
+
+    def __init__(self, revision, max_entries=MAX_ENTRIES, db_path=None):
+        self.revision = revision
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+
+    def key(self, normalized_text):
+        return hashlib.sha256(f"{self.revision}\0{normalized_text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key, adapt=None):
+        # adapt(résultat) -> résultat utilisable ou None : un résultat rejeté compte comme un miss
+        with self._lock:
+            disk = False
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    disk = True
+
+            if result is not None and adapt is not None:
+                result = adapt(result)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if disk:
+                self.disk_hits += 1
+            return result
+
+    def put_many(self, items):
+        with self._lock:
+            for key, result in items:
+                self._remember(key, result)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(result, ensure_ascii=False)) for key, result in items],
+                )
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+
+
+class CachedPredictor:
+    """Même interface que inferenceNERmtgArch.predict_batch, avec le cache devant le modèle."""
+
+    def __init__(self, cache, predict_fn=inferenceNERmtgArch.predict_batch):
+        self.cache = cache
+        self.predict_fn = predict_fn
+
+    def predict_batch(self, texts, batch_size=inferenceNERmtgArch.BATCH_SIZE):
+        # Le texte normalisé ne sert qu'à la clé : le modèle voit toujours le texte d'origine,
+        # pour que les offsets des tokens et des spans pointent dans le texte de l'appelant
+        results = [None] * len(texts)
+
+        missing = {}  # texte -> indices, pour ne prédire qu'une fois les doublons du lot
+        for i, text in enumerate(texts):
+            if text in missing:
+                missing[text].append(i)
+                continue
+            result = self.cache.get(self.cache.key(normalize_text(text)), lambda cached: rebase_result(cached, text))
+            if result is None:
+                missing[text] = [i]
+            else:
+                results[i] = result
+
+        if missing:
+            miss_texts = list(missing)
+            predictions = self.predict_fn(miss_texts, batch_size=batch_size)
+            self.cache.put_many([
+                (self.cache.key(normalize_text(text)), prediction) for text, prediction in zip(miss_texts, predictions)
+            ])
+            for text, prediction in zip(miss_texts, predictions):
+                for i in missing[text]:
+                    results[i] = prediction
+
+        return results
+
+    def warm(self, dataset_file=DATASET_FILE, batch_size=inferenceNERmtgArch.BATCH_SIZE, chunk_size=1024):
+        """Pré-remplit le cache avec les textes de ner_dataset_raw.json."""
+        chunk = []
+        for entry in iter_json_array(dataset_file, fields=("text",)):
+            chunk.append(entry["text"])
+            if len(chunk) >= chunk_size:
+                self.predict_batch(chunk, batch_size=batch_size)
+                chunk = []
+        if chunk:
+            self.predict_batch(chunk, batch_size=batch_size)
+
+
+def open_cached_predictor(model_dir=inferenceNERmtgArch.MODEL_DIR, db_path=CACHE_DB, max_entries=MAX_ENTRIES,
+                          backend_name=inferenceNERmtgArch.BACKEND, onnx_file=inferenceNERmtgArch.ONNX_FILE):
+    revision = model_revision(model_dir, backend_name, onnx_file)
+    return CachedPredictor(InferenceCache(revision, max_entries=max_entries, db_path=db_path))
+
+
+if __name__ == "__main__":
+    dataset_file = sys.argv[1] if len(sys.argv) > 1 else DATASET_FILE
+    predictor = open_cached_predictor()
+    print(f"🔥 Pré-chauffage du cache depuis {dataset_file}...")
+    predictor.warm(dataset_file)
+    print(f"📊 {predictor.cache.stats()}")
+    predictor.cache.close()
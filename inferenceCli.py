@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+
+from inferenceNERmtgArch import BATCH_SIZE, ONNX_FILE, build_result
+
+# Point d'entrée à démarrage rapide : ni transformers ni torch. Le modèle est l'export ONNX
+# (exportOnnx.py), exécuté par ONNX Runtime avec le tokenizer Rust de `tokenizers` ; un client
+# qui trouve le démon n'importe même pas ces deux-là.
+MODEL_DIR = "./ner-archetype-model-onnx"  # exportOnnx.OUTPUT_DIR (exportOnnx importe torch)
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), f"mtg-archetype-ner-{os.getuid()}.sock")
+MAX_LENGTH = 512  # si tokenizer_config.json n'en donne pas
+
+
+class LiteModel:
+    """
+    Même sortie que inferenceNERmtgArch.predict_batch, à partir du dossier écrit par
+    exportOnnx.py : model.onnx, config.json (id2label) et tokenizer.json.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, onnx_file=ONNX_FILE):
+        import numpy
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.numpy = numpy
+        with open(os.path.join(model_dir, "config.json"), encoding="utf-8") as f:
+            self.id2label = {int(i): label for i, label in json.load(f)["id2label"].items()}
+        with open(os.path.join(model_dir, "tokenizer_config.json"), encoding="utf-8") as f:
+            tokenizer_config = json.load(f)
+
+        # Mêmes réglages que tokenizer(..., truncation=True, padding=True) côté transformers
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        pad_token = tokenizer_config.get("pad_token", "[PAD]")
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token), pad_token=pad_token)
+        max_length = tokenizer_config.get("model_max_length", MAX_LENGTH)
+        self.tokenizer.enable_truncation(max_length if max_length < 1_000_000 else MAX_LENGTH)
+
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, onnx_file),
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def predict_batch(self, texts, batch_size=BATCH_SIZE):
+        results = [None] * len(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in indices])
+            inputs = {
+                "input_ids": [encoding.ids for encoding in encodings],
+                "attention_mask": [encoding.attention_mask for encoding in encodings],
+                "token_type_ids": [encoding.type_ids for encoding in encodings],
+            }
+            feed = {name: self.numpy.array(inputs[name], dtype=self.numpy.int64) for name in self.input_names}
+            predictions = self.session.run(["logits"], feed)[0].argmax(-1).tolist()
+
+            for row, i in enumerate(indices):
+                encoding = encodings[row]
+                results[i] = build_result(texts[i], encoding.tokens, encoding.word_ids, encoding.offsets,
+                                          predictions[row], self.id2label)
+        return results
+
+
+# ====== DÉMON ======
+
+class PredictionHandler(socketserver.StreamRequestHandler):
+    # Une requête JSON par ligne : {"texts": [...]} → {"results": [...]}, ou {"shutdown": true}
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request.get("shutdown"):
+                    self._reply({"ok": True})
+                    threading.Thread(target=self.server.shutdown).start()
+                    return
+                texts = request["texts"]
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    raise ValueError("texts must be a list of strings")
+                with self.server.lock:
+                    response = {"results": self.server.model.predict_batch(texts)}
+            except Exception as e:
+                # Toute erreur (requête invalide, onnxruntime...) a sa réponse : le client ne reste pas sans ligne
+                response = {"error": str(e)}
+            self._reply(response)
+
+    def _reply(self, payload):
+        self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+def serve(model, socket_path=SOCKET_PATH):
+    if os.path.exists(socket_path):
+        try:
+            request(socket_path, {"texts": []})
+            raise SystemExit(f"❌ Un démon écoute déjà sur {socket_path}")
+        except OSError:
+            os.remove(socket_path)  # socket orphelin d'un démon arrêté brutalement
+
+    server = socketserver.ThreadingUnixStreamServer(socket_path, PredictionHandler)
+    server.daemon_threads = True
+    server.model = model
+    server.lock = threading.Lock()
+    print(f"🚀 Démon d'inférence sur {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+        print("🚪 Démon arrêté")
+
+
+# ====== CLIENT ======
+
+def request(socket_path, payload):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reader:
+            response = json.loads(reader.readline())
+    if "error" in response:
+        raise ValueError(response["error"])
+    return response
+
+
+def predict(texts, socket_path=SOCKET_PATH, model_dir=MODEL_DIR, onnx_file=ONNX_FILE):
+    """Passe par le démon s'il tourne, sinon charge le modèle dans ce processus."""
+    try:
+        return request(socket_path, {"texts": texts})["results"]
+    except (FileNotFoundError, ConnectionRefusedError):
+        return LiteModel(model_dir, onnx_file).predict_batch(texts)
+
+
+def print_result(result):
+    print(f"\n📝 {result['text']}")
+    for span in result["spans"]:
+        print(f"   {span['text']:30} → {span['archetype']}")
+    if result["archetypes"]:
+        print(f"✅ Archetypes found: {result['archetypes']}")
+    else:
+        print("❌ No archetypes detected.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inférence d'archétypes à démarrage rapide (ONNX, démon local)")
+    parser.add_argument("texts", nargs="*", help="textes Oracle (sinon un par ligne sur l'entrée standard)")
+    parser.add_argument("--serve", action="store_true", help="lance le démon sur --socket")
+    parser.add_argument("--stop", action="store_true", help="arrête le démon")
+    parser.add_argument("--json", action="store_true", help="une ligne JSON par texte")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--onnx-file", default=ONNX_FILE)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(LiteModel(args.model_dir, args.onnx_file), args.socket)
+        return
+    if args.stop:
+        try:
+            request(args.socket, {"shutdown": True})
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise SystemExit(f"❌ Aucun démon sur {args.socket}")
+        return
+
+    texts = args.texts or [line.strip() for line in sys.stdin if line.strip()]
+    for result in predict(texts, args.socket, args.model_dir, args.onnx_file):
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False))
+        else:
+            print_result(result)
+
+
+if __name__ == "__main__":
+    main()
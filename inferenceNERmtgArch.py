@@ -1,61 +1,185 @@
-from transformers import AutoTokenizer, AutoModelForTokenClassification
-import torch
-
-# ====== Charger le modèle fine-tuné et le tokenizer ======
-model_dir = "./ner-archetype-model"
-tokenizer = AutoTokenizer.from_pretrained(model_dir)
-model = AutoModelForTokenClassification.from_pretrained(model_dir)
-
-DEBUG = False  # Passe à True pour activer le debug complet
-
-if DEBUG:
-    print("📋 id2label mapping:", model.config.id2label)
-
-# ====== Fonction d'inférence ======
-def predict_archetypes(text):
-    model.eval()
-    inputs = tokenizer(text, return_tensors="pt", truncation=True)
-
-    with torch.no_grad():
-        outputs = model(**inputs)
-
-    predictions = outputs.logits.argmax(-1)[0]
-    tokens = tokenizer.tokenize(text)
-    label_ids = predictions.tolist()
-    labels = [model.config.id2label[i] for i in label_ids]
-
-    found_archetypes = set()
-
-    if DEBUG:
-        print("\n🔍 Debug complet :\n")
-        for token, label in zip(tokens, labels[1:-1]):  # Ignorer [CLS] et [SEP]
-            print(f"{token:15} → {label}")
-
-    print("\n🔍 Résultats d'inférence :\n")
-    for token, label in zip(tokens, labels[1:-1]):
-        if label != "O":
-            print(f"{token:15} → {label}")
-
-            if "-" in label:
-                prefix, archetype = label.split("-", 1)
-                found_archetypes.add(archetype)
-
-    if found_archetypes:
-        print(f"\n✅ Archetypes found: {sorted(found_archetypes)}")
-    else:
-        print("\n❌ No archetypes detected.")
-
-
-# ====== Entrée utilisateur ======
-if __name__ == "__main__":
-    print("\n🧙‍♂️ Magic: The Gathering Archetype NER")
-    print("Type or paste the Oracle text of a card below:\n")
-
-    while True:
-        user_input = input("📝 Text > ").strip()
-        if not user_input:
-            print("🚪 Exiting...")
-            break
-
-        predict_archetypes(user_input)
-        print("\n---\n")
\ No newline at end of file
+import os
+
+from telemetry import StageTimer
+
+MODEL_DIR = "./ner-archetype-model"
+BACKEND = "torch"  # "torch" (PyTorch fp32) ou "onnx" (ONNX Runtime, voir exportOnnx.py)
+ONNX_FILE = "model.onnx"  # ou "model.int8.onnx" pour la version quantifiée
+BATCH_SIZE = 32  # textes par forward pass, chaque batch est paddé à son plus long membre
+
+DEBUG = False  # Passe à True pour activer le debug complet
+
+# ====== Modèle fine-tuné et tokenizer, chargés une seule fois ======
+# transformers et torch ne sont importés qu'au chargement : importer ce module reste instantané
+tokenizer = None
+model = None
+backend = None
+
+# Temps cumulé tokenizer / forward / post-traitement (exposé par inferenceServer)
+timings = StageTimer()
+
+class OnnxOutput:
+    def __init__(self, logits):
+        self.logits = logits
+
+class OnnxTokenClassifier:
+    """Modèle exporté par exportOnnx.py, exécuté par ONNX Runtime sur CPU."""
+
+    def __init__(self, model_dir, onnx_file=ONNX_FILE):
+        import onnxruntime
+        from transformers import AutoConfig
+
+        self.config = AutoConfig.from_pretrained(model_dir)
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, onnx_file),
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, **inputs):
+        feed = {name: inputs[name].astype("int64") for name in self.input_names if name in inputs}
+        logits = self.session.run(["logits"], feed)[0]
+        return OnnxOutput(logits)
+
+def load_model(model_dir=MODEL_DIR, backend_name=BACKEND, onnx_file=ONNX_FILE):
+    global tokenizer, model, backend
+    if model is None:
+        from transformers import AutoTokenizer, AutoModelForTokenClassification
+
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        if backend_name == "onnx":
+            model = OnnxTokenClassifier(model_dir, onnx_file)
+        elif backend_name == "torch":
+            model = AutoModelForTokenClassification.from_pretrained(model_dir)
+            model.eval()
+        else:
+            raise ValueError(f"Backend inconnu : {backend_name}")
+        backend = backend_name
+
+        if DEBUG:
+            print("📋 id2label mapping:", model.config.id2label)
+    return tokenizer, model
+
+def unload_model():
+    # Permet de recharger avec un autre backend (benchmarks, comparaisons)
+    global tokenizer, model, backend
+    tokenizer = model = backend = None
+
+def decode_spans(text, tokens):
+    # Regroupe les tokens B-/I- consécutifs d'un même archétype en spans de caractères
+    spans = []
+    current = None
+    for token in tokens:
+        label = token["label"]
+        if "-" not in label:
+            current = None
+            continue
+
+        prefix, archetype = label.split("-", 1)
+        if prefix == "B" or current is None or current["archetype"] != archetype:
+            current = {"archetype": archetype, "start": token["start"], "end": token["end"]}
+            spans.append(current)
+        else:
+            current["end"] = token["end"]
+
+    for span in spans:
+        span["text"] = text[span["start"]:span["end"]]
+    return spans
+
+def build_result(text, token_strings, word_ids, offsets, label_ids, id2label):
+    # Une ligne du batch → tokens labellisés, spans et archétypes (aussi utilisé par inferenceCli)
+    tokens = [
+        {
+            "token": token_strings[j],
+            "label": id2label[label_id],
+            "start": offsets[j][0],
+            "end": offsets[j][1],
+        }
+        for j, (word_id, label_id) in enumerate(zip(word_ids, label_ids))
+        if word_id is not None  # Ignorer [CLS], [SEP] et le padding
+    ]
+    spans = decode_spans(text, tokens)
+    archetypes = {token["label"].split("-", 1)[1] for token in tokens if "-" in token["label"]}
+    return {
+        "text": text,
+        "tokens": tokens,
+        "spans": spans,
+        "archetypes": sorted(archetypes),
+    }
+
+# ====== Fonction d'inférence par lots ======
+def predict_batch(texts, batch_size=BATCH_SIZE):
+    """
+    Renvoie pour chaque texte un dict {"text", "tokens", "spans", "archetypes"}, dans l'ordre d'entrée.
+    Les textes sont triés par longueur avant d'être groupés, pour limiter le padding.
+    """
+    import torch
+
+    load_model()
+    results = [None] * len(texts)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        with timings.stage("tokenizer"):
+            encoding = tokenizer(
+                [texts[i] for i in indices],
+                return_tensors="np" if backend == "onnx" else "pt",
+                truncation=True,
+                padding=True,
+                return_offsets_mapping=True,
+            )
+            offsets = encoding.pop("offset_mapping").tolist()
+
+        with timings.stage("forward"), torch.no_grad():
+            outputs = model(**encoding)
+
+        with timings.stage("postprocess"):
+            predictions = outputs.logits.argmax(-1).tolist()
+
+            for row, i in enumerate(indices):
+                results[i] = build_result(texts[i], encoding.tokens(row), encoding.word_ids(row), offsets[row],
+                                          predictions[row], model.config.id2label)
+
+        timings.count("batches")
+        timings.count("texts", len(indices))
+        timings.count("padded_tokens", len(predictions) * len(predictions[0]))
+
+    return results
+
+def predict_archetypes(text):
+    result = predict_batch([text])[0]
+
+    if DEBUG:
+        print("\n🔍 Debug complet :\n")
+        for token in result["tokens"]:
+            print(f"{token['token']:15} → {token['label']}")
+
+    print("\n🔍 Résultats d'inférence :\n")
+    for token in result["tokens"]:
+        if token["label"] != "O":
+            print(f"{token['token']:15} → {token['label']}")
+
+    if result["archetypes"]:
+        print(f"\n✅ Archetypes found: {result['archetypes']}")
+    else:
+        print("\n❌ No archetypes detected.")
+
+    return result
+
+
+# ====== Entrée utilisateur ======
+if __name__ == "__main__":
+    load_model()
+
+    print("\n🧙‍♂️ Magic: The Gathering Archetype NER")
+    print("Type or paste the Oracle text of a card below:\n")
+
+    while True:
+        user_input = input("📝 Text > ").strip()
+        if not user_input:
+            print("🚪 Exiting...")
+            break
+
+        predict_archetypes(user_input)
+        print("\n---\n")
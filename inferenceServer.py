@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import inferenceNERmtgArch
+from inferenceCache import CACHE_DB, MAX_ENTRIES, open_cached_predictor
+from telemetry import JsonlLog, format_prometheus, peak_memory_bytes, write_prometheus
+
+HOST = "127.0.0.1"
+PORT = 8000
+MAX_BATCH_SIZE = 32  # textes par forward pass
+MAX_WAIT_MS = 10  # attente max pour remplir un micro-batch
+LATENCY_WINDOW = 10000  # requêtes gardées pour les percentiles
+TELEMETRY_INTERVAL = 15  # secondes entre deux écritures de --telemetry-dir
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class MicroBatcher:
+    """
+    Regroupe les requêtes concurrentes en micro-batches : un thread unique attend la
+    première requête, puis accumule les suivantes jusqu'à `max_batch_size` textes ou
+    `max_wait` secondes, et lance un seul appel à `predict_fn` pour tout le lot.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT_MS / 1000):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        future = Future()
+        self._queue.put((texts, future, time.monotonic()))
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for item in batch for text in item[0]]
+            try:
+                results = self.predict_fn(texts, batch_size=self.max_batch_size)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            now = time.monotonic()
+            offset = 0
+            with self._lock:
+                for item_texts, future, submitted in batch:
+                    future.set_result(results[offset:offset + len(item_texts)])
+                    offset += len(item_texts)
+                    self._latencies.append(now - submitted)
+                self.requests += len(batch)
+                self.texts += len(texts)
+                self.batches += 1
+
+    def stats(self):
+        with self._lock:
+            latencies = list(self._latencies)
+            elapsed = time.monotonic() - self.started
+            p50 = percentile(latencies, 0.50)
+            p99 = percentile(latencies, 0.99)
+            return {
+                "requests": self.requests,
+                "texts": self.texts,
+                "batches": self.batches,
+                "mean_batch_size": self.texts / self.batches if self.batches else 0.0,
+                "latency_p50_ms": p50 * 1000 if p50 is not None else None,
+                "latency_p99_ms": p99 * 1000 if p99 is not None else None,
+                "throughput_texts_per_s": self.texts / elapsed if elapsed else 0.0,
+            }
+
+
+def server_metrics(batcher, cache=None):
+    # Compteurs du batcher + répartition tokenizer / forward / post-traitement de predict_batch
+    stats = batcher.stats()
+    metrics = {
+        "inference_requests_total": ("counter", "Requêtes /predict servies", stats["requests"]),
+        "inference_texts_total": ("counter", "Textes prédits", stats["texts"]),
+        "inference_batches_total": ("counter", "Micro-batches exécutés", stats["batches"]),
+        # Percentiles d'une fenêtre glissante, sans _sum/_count : des gauges, pas un summary
+        "inference_latency_p50_seconds": ("gauge", "Latence médiane des requêtes (fenêtre glissante)",
+                                          stats["latency_p50_ms"] / 1000 if stats["latency_p50_ms"] is not None else None),
+        "inference_latency_p99_seconds": ("gauge", "Latence p99 des requêtes (fenêtre glissante)",
+                                          stats["latency_p99_ms"] / 1000 if stats["latency_p99_ms"] is not None else None),
+        "inference_peak_memory_bytes": ("gauge", "Pic mémoire (GPU si CUDA, sinon RSS)", peak_memory_bytes()),
+    }
+    metrics.update(inferenceNERmtgArch.timings.prometheus_metrics("inference"))
+    if cache is not None:
+        cache_stats = cache.stats()
+        metrics["inference_cache_hits_total"] = ("counter", "Hits du cache", cache_stats["hits"])
+        metrics["inference_cache_misses_total"] = ("counter", "Misses du cache", cache_stats["misses"])
+    return metrics
+
+
+def telemetry_loop(telemetry_dir, batcher, cache=None, interval=TELEMETRY_INTERVAL):
+    # Textfile Prometheus (inference.prom) et instantané JSONL, réécrits toutes les `interval` secondes
+    log = JsonlLog(os.path.join(telemetry_dir, "inference.jsonl"))
+    while True:
+        time.sleep(interval)
+        write_prometheus(os.path.join(telemetry_dir, "inference.prom"), server_metrics(batcher, cache))
+        log.write("stats", **batcher.stats(), timings=inferenceNERmtgArch.timings.snapshot())
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    batcher = None
+    cache = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            stats = self.batcher.stats()
+            if self.cache is not None:
+                stats["cache"] = self.cache.stats()
+            stats["timings"] = inferenceNERmtgArch.timings.snapshot()
+            self._send_json(200, stats)
+        elif self.path == "/metrics":
+            body = format_prometheus(server_metrics(self.batcher, self.cache)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            texts = payload["texts"] if "texts" in payload else [payload["text"]]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("texts must be a list of strings")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            results = self.batcher.submit(texts)
+        except Exception as e:
+            # Erreur du modèle, transmise par MicroBatcher : le client reçoit quand même une réponse
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {"results": results})
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(host=HOST, port=PORT, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS,
+          predict_fn=inferenceNERmtgArch.predict_batch, cache=None, telemetry_dir=None):
+    InferenceHandler.batcher = MicroBatcher(predict_fn, max_batch_size, max_wait_ms / 1000)
+    InferenceHandler.cache = cache
+    if telemetry_dir:
+        threading.Thread(target=telemetry_loop, args=(telemetry_dir, InferenceHandler.batcher, cache), daemon=True).start()
+    server = ThreadingHTTPServer((host, port), InferenceHandler)
+    print(f"🚀 Serveur d'inférence sur http://{host}:{port} (batch max {max_batch_size}, attente max {max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("🚪 Arrêt du serveur")
+        print(f"📊 {InferenceHandler.batcher.stats()}")
+        print(f"⏱️ {inferenceNERmtgArch.timings.snapshot()}")
+        if cache is not None:
+            print(f"📊 Cache : {cache.stats()}")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur HTTP de micro-batching pour le modèle NER d'archétypes")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--model-dir", default=inferenceNERmtgArch.MODEL_DIR)
+    parser.add_argument("--backend", choices=["torch", "onnx"], default=inferenceNERmtgArch.BACKEND)
+    parser.add_argument("--onnx-file", default=inferenceNERmtgArch.ONNX_FILE)
+    parser.add_argument("--cache-db", default=CACHE_DB, help="tier SQLite du cache ('' pour mémoire seule)")
+    parser.add_argument("--cache-size", type=int, default=MAX_ENTRIES)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--telemetry-dir", help="écrit inference.prom et inference.jsonl dans ce dossier (GET /metrics sinon)")
+    args = parser.parse_args()
+
+    inferenceNERmtgArch.load_model(args.model_dir, args.backend, args.onnx_file)
+    if args.no_cache:
+        serve(args.host, args.port, args.max_batch_size, args.max_wait_ms, telemetry_dir=args.telemetry_dir)
+    else:
+        predictor = open_cached_predictor(args.model_dir, db_path=args.cache_db or None, max_entries=args.cache_size,
+                                          backend_name=args.backend, onnx_file=args.onnx_file)
+        serve(args.host, args.port, args.max_batch_size, args.max_wait_ms,
+              predict_fn=predictor.predict_batch, cache=predictor.cache, telemetry_dir=args.telemetry_dir)
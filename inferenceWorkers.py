@@ -0,0 +1,101 @@
+import argparse
+import json
+import multiprocessing
+import os
+
+import torch
+
+import inferenceNERmtgArch
+
+NUM_WORKERS = os.cpu_count() or 1
+BATCH_SIZE = inferenceNERmtgArch.BATCH_SIZE
+
+
+def init_worker(num_threads):
+    # Un pool de threads intra-op par worker, dimensionné pour que workers × threads = cœurs
+    torch.set_num_threads(num_threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+
+def predict_chunk(texts):
+    return inferenceNERmtgArch.predict_batch(texts, batch_size=len(texts))
+
+
+class InferenceWorkerPool:
+    """
+    `num_workers` processus d'inférence forkés depuis un parent qui a chargé le modèle une
+    seule fois : les poids sont déplacés en mémoire partagée (`share_memory()`) avant le
+    fork, chaque worker les lit sans copie. Seul le backend PyTorch est concerné : une
+    session ONNX Runtime ne survit pas à un fork.
+
+    `predict_batch` a la même interface que celle d'inferenceNERmtgArch : les textes sont
+    triés par longueur, découpés en batches, et chaque worker prend le batch suivant dès
+    qu'il est libre, les plus longs d'abord.
+
+    Le parent ne doit pas avoir lancé d'inférence avant la création du pool (threads
+    OpenMP déjà démarrés au moment du fork).
+    """
+
+    def __init__(self, num_workers=NUM_WORKERS, threads_per_worker=None, model_dir=inferenceNERmtgArch.MODEL_DIR,
+                 batch_size=BATCH_SIZE):
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+        self.batch_size = batch_size
+
+        _, model = inferenceNERmtgArch.load_model(model_dir, "torch")
+        if inferenceNERmtgArch.backend != "torch":
+            raise ValueError("InferenceWorkerPool ne fonctionne qu'avec le backend torch")
+        model.share_memory()
+
+        # fork : les workers héritent du modèle déjà chargé, démarrés tous d'un coup
+        self._pool = multiprocessing.get_context("fork").Pool(
+            num_workers, initializer=init_worker, initargs=(self.threads_per_worker,)
+        )
+
+    def predict_batch(self, texts, batch_size=None):
+        batch_size = batch_size or self.batch_size
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        batches = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+        results = [None] * len(texts)
+        chunks = self._pool.imap(predict_chunk, ([texts[i] for i in indices] for indices in batches), chunksize=1)
+        for indices, chunk_results in zip(batches, chunks):
+            for i, result in zip(indices, chunk_results):
+                results[i] = result
+        return results
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inférence d'archétypes sur plusieurs processus, poids partagés")
+    parser.add_argument("input_file", help="liste JSON de textes")
+    parser.add_argument("output_file")
+    parser.add_argument("--model-dir", default=inferenceNERmtgArch.MODEL_DIR)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    parser.add_argument("--threads-per-worker", type=int)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    with open(args.input_file, encoding="utf-8") as f:
+        texts = json.load(f)
+
+    with InferenceWorkerPool(args.workers, args.threads_per_worker, args.model_dir, args.batch_size) as pool:
+        print(f"🚀 {pool.num_workers} workers × {pool.threads_per_worker} threads")
+        results = pool.predict_batch(texts)
+
+    with open(args.output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"✅ {len(results)} textes → {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import json
+
+
+# Un mot au sens de \b dans re : caractère alphanumérique Unicode ou "_"
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """
+    Automate Aho-Corasick compilé une seule fois à partir de archetype_to_keywords.json.
+
+    `match(text)` renvoie l'ensemble des archétypes dont au moins un mot-clé apparaît
+    dans le texte, avec exactement la même sémantique que la boucle
+    `re.search(r'\\b' + re.escape(keyword.lower()) + r'\\b', text.lower())`.
+    """
+
+    def __init__(self, archetype_to_keywords):
+        self.archetypes = list(archetype_to_keywords.keys())
+
+        # Trie : une table de transitions par état, état 0 = racine
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]  # (longueur du mot-clé, index de l'archétype)
+
+        # re.escape("") donne r"\b\b" : match dès qu'il existe une frontière de mot
+        self._empty_keyword_archetypes = set()
+
+        for arch_idx, archetype in enumerate(self.archetypes):
+            for keyword in archetype_to_keywords[archetype]:
+                keyword = keyword.lower()
+                if not keyword:
+                    self._empty_keyword_archetypes.add(arch_idx)
+                    continue
+                self._add(keyword, arch_idx)
+
+        self._build_failure_links()
+
+    def _add(self, keyword, arch_idx):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        entry = (len(keyword), arch_idx)
+        if entry not in self._out[state]:
+            self._out[state].append(entry)
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + [e for e in self._out[self._fail[nxt]] if e not in self._out[nxt]]
+
+    def _match_indices(self, text_lower):
+        found = set()
+        if self._empty_keyword_archetypes and any(_is_word_char(ch) for ch in text_lower):
+            found.update(self._empty_keyword_archetypes)
+
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(text_lower)
+        state = 0
+        for end, ch in enumerate(text_lower, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+
+            end_is_word = _is_word_char(ch)
+            after_is_word = end < n and _is_word_char(text_lower[end])
+            if end_is_word == after_is_word:
+                continue  # pas de frontière de mot en fin de match
+
+            for length, arch_idx in out[state]:
+                if arch_idx in found:
+                    continue
+                start = end - length
+                before_is_word = start > 0 and _is_word_char(text_lower[start - 1])
+                if before_is_word != _is_word_char(text_lower[start]):
+                    found.add(arch_idx)
+        return found
+
+    def match(self, text):
+        """Renvoie l'ensemble des archétypes dont un mot-clé apparaît dans `text`."""
+        return {self.archetypes[i] for i in self._match_indices(text.lower())}
+
+
+def load_matcher(path="archetype_to_keywords.json"):
+    with open(path, "r", encoding="utf-8") as f:
+        return KeywordMatcher(json.load(f))
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import shutil
+from array import array
+from bisect import bisect_right
+
+import numpy as np
+
+SHARD_DIR = "ner_shards"
+INDEX_FILE = "index.json"
+SHARD_EXAMPLES = 50_000  # exemples par shard
+LABEL_PAD_ID = -100  # tokens spéciaux, ignorés par la loss
+
+
+def vocab_fingerprint(tokenizer):
+    # Les ids n'ont de sens qu'avec le vocabulaire qui les a produits
+    vocab = json.dumps(sorted(tokenizer.get_vocab().items()), ensure_ascii=False)
+    return hashlib.sha256(vocab.encode("utf-8")).hexdigest()[:16]
+
+
+def data_fingerprints(data_files):
+    # Empreinte de chaque split JSON dont les shards sont la conversion
+    fingerprints = {}
+    for split, path in data_files.items():
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        fingerprints[split] = digest.hexdigest()[:16]
+    return fingerprints
+
+
+# ====== ÉCRITURE ======
+
+class ShardWriter:
+    """
+    Écrit les exemples d'un split ({"tokens", "labels"} de prepareNerData) en shards .npy :
+    input_ids int32 et label ids int16 concaténés, offsets int64 (n + 1) par exemple.
+    Chaque séquence est stockée complète avec [CLS] et [SEP], la troncature se fait à la lecture.
+    """
+
+    def __init__(self, split_dir, tokenizer, label_to_id, shard_examples=SHARD_EXAMPLES):
+        self.split_dir = split_dir
+        self.tokenizer = tokenizer
+        self.label_to_id = label_to_id
+        self.shard_examples = shard_examples
+        self.shards = []
+        self.examples = 0
+        self.tokens = 0
+        self._reset()
+        os.makedirs(split_dir, exist_ok=True)
+
+    def add(self, example):
+        ids = self.tokenizer.convert_tokens_to_ids(example["tokens"])
+        self._ids.append(self.tokenizer.cls_token_id)
+        self._ids.extend(ids)
+        self._ids.append(self.tokenizer.sep_token_id)
+
+        self._labels.append(LABEL_PAD_ID)
+        self._labels.extend(self.label_to_id[label] for label in example["labels"])
+        self._labels.append(LABEL_PAD_ID)
+
+        self._lengths.append(len(ids) + 2)
+        if len(self._lengths) >= self.shard_examples:
+            self._flush()
+
+    def _flush(self):
+        if not self._lengths:
+            return
+        prefix = f"shard-{len(self.shards):05d}"
+        offsets = np.zeros(len(self._lengths) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.frombuffer(self._lengths, dtype=np.int64))
+        np.save(os.path.join(self.split_dir, f"{prefix}.input_ids.npy"), np.frombuffer(self._ids, dtype=np.int32))
+        np.save(os.path.join(self.split_dir, f"{prefix}.labels.npy"), np.frombuffer(self._labels, dtype=np.int16))
+        np.save(os.path.join(self.split_dir, f"{prefix}.offsets.npy"), offsets)
+
+        self.shards.append({"prefix": prefix, "examples": len(self._lengths), "tokens": int(offsets[-1])})
+        self.examples += len(self._lengths)
+        self.tokens += int(offsets[-1])
+        self._reset()
+
+    def _reset(self):
+        # Tampons compacts (4 / 2 / 8 octets par valeur) : un shard entier tient en quelques Mo
+        self._ids, self._labels, self._lengths = array("i"), array("h"), array("q")
+
+    def close(self):
+        self._flush()
+        return {"examples": self.examples, "tokens": self.tokens, "shards": self.shards}
+
+
+def write_index(shard_dir, splits, tokenizer, label_list, data_files=None):
+    index = {
+        "tokenizer": tokenizer.name_or_path,
+        "vocab": vocab_fingerprint(tokenizer),
+        "label_list": label_list,
+        "splits": splits,
+    }
+    if data_files is not None:
+        index["data"] = data_fingerprints(data_files)
+    with open(os.path.join(shard_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    return index
+
+
+class ShardSetWriter:
+    """
+    Un ShardWriter par split, alimentés au fil de l'eau. Le dossier est construit à côté puis
+    mis en place d'un coup à la fermeture : un lecteur ne voit jamais un index qui pointe
+    vers des shards incomplets.
+    """
+
+    def __init__(self, tokenizer, label_list, splits=(), shard_dir=SHARD_DIR, shard_examples=SHARD_EXAMPLES):
+        self.tokenizer = tokenizer
+        self.label_list = label_list
+        self.label_to_id = {label: i for i, label in enumerate(label_list)}
+        self.shard_dir = shard_dir
+        self.shard_examples = shard_examples
+        self.tmp_dir = shard_dir + ".tmp"
+        self.writers = {}
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        for split in splits:
+            self.writer(split)  # un split vide existe quand même dans l'index
+
+    def writer(self, split):
+        writer = self.writers.get(split)
+        if writer is None:
+            writer = self.writers[split] = ShardWriter(
+                os.path.join(self.tmp_dir, split), self.tokenizer, self.label_to_id, self.shard_examples
+            )
+        return writer
+
+    def add(self, split, example):
+        self.writer(split).add(example)
+
+    def close(self, data_files=None):
+        # data_files : {split: JSON} déjà écrits, dont l'empreinte est gardée dans l'index
+        infos = {split: writer.close() for split, writer in self.writers.items()}
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        index = write_index(self.tmp_dir, infos, self.tokenizer, self.label_list, data_files)
+
+        shutil.rmtree(self.shard_dir, ignore_errors=True)
+        os.replace(self.tmp_dir, self.shard_dir)
+        return index
+
+    def abort(self):
+        # Abandonne les shards en cours : le dossier déjà en place reste tel quel
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def write_shards(splits, tokenizer, label_list, shard_dir=SHARD_DIR, shard_examples=SHARD_EXAMPLES, data_files=None):
+    """Écrit {split: exemples} dans `shard_dir` ; `data_files` donne les JSON correspondants."""
+    shard_set = ShardSetWriter(tokenizer, label_list, splits, shard_dir, shard_examples)
+    for split, examples in splits.items():
+        for example in examples:
+            shard_set.add(split, example)
+    return shard_set.close(data_files)
+
+
+# ====== LECTURE ======
+
+class NerShardDataset:
+    """
+    Split mappé en mémoire : chaque élément est un dict input_ids / labels prêt pour
+    DataCollatorForTokenClassification, sans tokenisation.
+    """
+
+    def __init__(self, split_dir, shards, max_length=None):
+        self.max_length = max_length
+        self._shards = []
+        self._starts = [0]
+        for shard in shards:
+            prefix = os.path.join(split_dir, shard["prefix"])
+            self._shards.append(tuple(
+                np.load(f"{prefix}.{name}.npy", mmap_mode="r").view(np.ndarray)
+                for name in ("input_ids", "labels", "offsets")
+            ))
+            self._starts.append(self._starts[-1] + shard["examples"])
+
+    def __len__(self):
+        return self._starts[-1]
+
+    def lengths(self):
+        lengths = np.concatenate([np.diff(offsets) for _, _, offsets in self._shards] or [np.empty(0, dtype=np.int64)])
+        return (np.minimum(lengths, self.max_length) if self.max_length else lengths).tolist()
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        shard = bisect_right(self._starts, index) - 1
+        input_ids, labels, offsets = self._shards[shard]
+        start, end = offsets[index - self._starts[shard]], offsets[index - self._starts[shard] + 1]
+
+        ids = input_ids[start:end].tolist()
+        label_ids = labels[start:end].tolist()
+        if self.max_length and len(ids) > self.max_length:
+            # Même troncature que le tokenizer : on garde [SEP] en dernière position
+            ids = ids[:self.max_length - 1] + ids[-1:]
+            label_ids = label_ids[:self.max_length - 1] + [LABEL_PAD_ID]
+        return {"input_ids": ids, "labels": label_ids}
+
+
+def load_index(shard_dir=SHARD_DIR):
+    with open(os.path.join(shard_dir, INDEX_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def shards_match(tokenizer, label_list, shard_dir=SHARD_DIR, data_files=None):
+    """
+    Vrai si les shards existent et ont été écrits avec ce vocabulaire et cette label list et,
+    si `data_files` est donné, à partir du contenu actuel de ces JSON.
+    """
+    if not os.path.exists(os.path.join(shard_dir, INDEX_FILE)):
+        return False
+    index = load_index(shard_dir)
+    if index["vocab"] != vocab_fingerprint(tokenizer) or index["label_list"] != label_list:
+        return False
+    return data_files is None or index.get("data") == data_fingerprints(data_files)
+
+
+def open_shards(shard_dir=SHARD_DIR, max_length=None):
+    index = load_index(shard_dir)
+    return {
+        split: NerShardDataset(os.path.join(shard_dir, split), info["shards"], max_length)
+        for split, info in index["splits"].items()
+    }
@@ -0,0 +1,194 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+import zstandard
+
+ARCHIVE_DIR = "page_archive"
+PAGES_FILE = "pages.zst"
+INDEX_FILE = "index.jsonl"
+COMPRESSION_LEVEL = 10
+
+
+class PageArchive:
+    """
+    Archive locale des pages HTML récupérées par les scrapers, pour pouvoir les re-parser
+    sans réseau (voir reparse.py).
+
+    `pages.zst` est une suite de frames zstd indépendantes, une par page, ajoutées en fin
+    de fichier ; `index.jsonl` donne pour chaque page son URL, son type (`kind`), sa clé
+    (nom du tag, du commandant...) et la position de sa frame. La dernière entrée d'une URL
+    fait foi. Comme pour CheckpointJournal, une ligne d'index tronquée par un crash est
+    ignorée et les octets qu'elle décrivait sont coupés au prochain démarrage ; une entrée
+    qui pointe au-delà de la fin de pages.zst est coupée de l'index avec les suivantes.
+
+    Avec `read_only=True` (reparse.py --dry-run), l'index est rejoué de la même façon mais
+    rien n'est créé ni coupé sur le disque, et `put`/`compact` sont refusés.
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, level=COMPRESSION_LEVEL, read_only=False):
+        self.archive_dir = archive_dir
+        self.pages_file = os.path.join(archive_dir, PAGES_FILE)
+        self.index_file = os.path.join(archive_dir, INDEX_FILE)
+        self.read_only = read_only
+        self.entries = {}  # url -> dernière entrée d'index
+        self._lock = threading.Lock()  # gettags écrit depuis plusieurs threads
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+        if read_only:
+            self._replay()
+            self._pages = open(self.pages_file, "rb") if os.path.exists(self.pages_file) else None
+            self._index = None
+            return
+
+        os.makedirs(archive_dir, exist_ok=True)
+        end = self._replay()
+        self._pages = open(self.pages_file, "a+b")
+        if os.path.getsize(self.pages_file) > end:
+            self._pages.truncate(end)  # frame écrite sans son entrée d'index
+        self._index = open(self.index_file, "a", encoding="utf-8")
+
+    def _replay(self):
+        if not os.path.exists(self.index_file):
+            return 0
+
+        pages_size = os.path.getsize(self.pages_file) if os.path.exists(self.pages_file) else 0
+        end = 0
+        valid_end = 0
+        with open(self.index_file, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entry["offset"] + entry["length"] > pages_size:
+                    break  # frame absente de pages.zst (fichier tronqué) : cette entrée et les suivantes tombent
+                self.entries[entry["url"]] = entry
+                end = max(end, entry["offset"] + entry["length"])
+                valid_end += len(line)
+
+        if valid_end != os.path.getsize(self.index_file) and not self.read_only:
+            with open(self.index_file, "r+b") as f:
+                f.truncate(valid_end)
+        return end
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def put(self, url, html, kind, key=None, **meta):
+        """Archive une page ; renvoie False si son contenu est identique à la dernière version."""
+        if self.read_only:
+            raise ValueError(f"{self.archive_dir} est ouverte en lecture seule")
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        frame = self._compressor.compress(data)
+
+        with self._lock:
+            previous = self.entries.get(url)
+            if previous is not None and previous["sha256"] == digest and previous.get("meta", {}) == meta:
+                return False
+
+            self._pages.seek(0, os.SEEK_END)
+            offset = self._pages.tell()
+            self._pages.write(frame)
+            self._pages.flush()  # la frame avant son entrée d'index
+
+            entry = {"url": url, "kind": kind, "key": key, "offset": offset, "length": len(frame),
+                     "size": len(data), "sha256": digest, "fetched_at": time.time()}
+            if meta:
+                entry["meta"] = meta
+            self._index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._index.flush()
+            self.entries[url] = entry
+        return True
+
+    def get(self, url):
+        entry = self.entries.get(url)
+        return None if entry is None else read_page(self._pages.fileno(), entry, self._decompressor)
+
+    def latest(self, kind=None):
+        """Dernière version de chaque page, dans l'ordre du fichier (lectures séquentielles)."""
+        entries = [entry for entry in self.entries.values() if kind is None or entry["kind"] == kind]
+        return sorted(entries, key=lambda entry: entry["offset"])
+
+    def stats(self):
+        entries = self.entries.values()
+        kinds = {}
+        for entry in entries:
+            kinds[entry["kind"]] = kinds.get(entry["kind"], 0) + 1
+        return {
+            "pages": len(self.entries),
+            "kinds": kinds,
+            "html_mb": sum(entry["size"] for entry in entries) / 1e6,
+            "file_mb": os.path.getsize(self.pages_file) / 1e6 if os.path.exists(self.pages_file) else 0.0,
+        }
+
+    def compact(self):
+        # Réécrit l'archive sans les anciennes versions des pages
+        if self.read_only:
+            raise ValueError(f"{self.archive_dir} est ouverte en lecture seule")
+        tmp_pages = self.pages_file + ".tmp"
+        tmp_index = self.index_file + ".tmp"
+        entries = {}
+        with self._lock, open(tmp_pages, "wb") as pages, open(tmp_index, "w", encoding="utf-8") as index:
+            for entry in self.latest():
+                frame = os.pread(self._pages.fileno(), entry["length"], entry["offset"])
+                entry = {**entry, "offset": pages.tell()}
+                pages.write(frame)
+                index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                entries[entry["url"]] = entry
+
+            self._pages.close()
+            self._index.close()
+            os.replace(tmp_pages, self.pages_file)
+            os.replace(tmp_index, self.index_file)
+            self._pages = open(self.pages_file, "a+b")
+            self._index = open(self.index_file, "a", encoding="utf-8")
+            self.entries = entries
+
+    def close(self):
+        with self._lock:
+            for f in (self._pages, self._index):
+                if f is not None:
+                    f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_page(fd, entry, decompressor):
+    # pread : pas de position de fichier partagée, utilisable depuis plusieurs threads ou processus
+    frame = os.pread(fd, entry["length"], entry["offset"])
+    return decompressor.decompress(frame, max_output_size=entry["size"]).decode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive locale des pages EDHREC")
+    parser.add_argument("command", choices=["stats", "compact"])
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    with PageArchive(args.archive_dir) as archive:
+        if args.command == "compact":
+            before = os.path.getsize(archive.pages_file)
+            archive.compact()
+            print(f"🧹 {before / 1e6:.1f} Mo → {os.path.getsize(archive.pages_file) / 1e6:.1f} Mo")
+        stats = archive.stats()
+        print(f"📚 {stats['pages']} pages {stats['kinds']} : {stats['html_mb']:.1f} Mo de HTML "
+              f"dans {stats['file_mb']:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
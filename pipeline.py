@@ -0,0 +1,259 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+STATE_FILE = ".pipeline_state.json"
+LOG_DIR = "pipeline_logs"
+JOBS = 3
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+# Un répertoire en entrée (store, index, shards) est représenté par son fichier de métadonnées
+META_FILES = ("meta.json", "index.json")
+
+# Chaque étape est un script du dépôt ; les dépendances se déduisent des fichiers
+# produits par une étape et lus par une autre
+Stage = namedtuple("Stage", "name script inputs outputs")
+
+STAGES = (
+    Stage("commanders", "getcoms.py", ("oracle-cards-20250404090221.json", "card_store"), ("filtered_commanders.json",)),
+    # Relit sa propre sortie pour en garder les mots-clés remplis à la main
+    Stage("keywords", "buildArchetypeToKeyword.py",
+          ("edhrec_tags_to_cards.json", "archetype_to_keywords.json"), ("archetype_to_keywords.json",)),
+    Stage("labels", "createLabelList.py", ("edhrec_tags_to_cards.json",), ("label_list.json",)),
+    Stage("merge", "mergeTagsAndComs.py",
+          ("oracle-cards-20250404090221.json", "edhrec_tags_to_cards.json", "archetype_to_keywords.json", "tag_index"),
+          ("ner_dataset_raw.json",)),
+    Stage("prepare", "prepareNerData.py",
+          ("ner_dataset_raw.json", "archetype_to_keywords.json", "label_list.json"),
+          ("ner_train.json", "ner_val.json", "ner_test.json", "ner_shards")),
+    Stage("train", "trainNER.py",
+          ("ner_train.json", "ner_val.json", "ner_test.json", "label_list.json", "ner_shards"), ("ner-archetype-model",)),
+)
+
+
+def dependencies(stages):
+    producers = {output: stage.name for stage in stages for output in stage.outputs}
+    return {
+        stage.name: {producers[path] for path in stage.inputs if producers.get(path, stage.name) != stage.name}
+        for stage in stages
+    }
+
+
+def local_sources(script, repo_dir=REPO_DIR):
+    """Le script et, récursivement, les modules du dépôt qu'il importe."""
+    seen, pending = set(), [script]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(os.path.join(repo_dir, path), encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = name.split(".")[0] + ".py"
+                if os.path.exists(os.path.join(repo_dir, module)):
+                    pending.append(module)
+    return sorted(seen)
+
+
+class ContentHasher:
+    """
+    sha256 des fichiers, mémorisé par (taille, mtime) : un dump Scryfall inchangé n'est
+    pas relu à chaque lancement.
+    """
+
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        key = [stat.st_size, stat.st_mtime_ns]
+        cached = self.known.get(path)
+        if cached and cached[:2] == key:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self.known[path] = key + [digest.hexdigest()]
+        return digest.hexdigest()
+
+    def input_hash(self, path):
+        if os.path.isdir(path):
+            meta_files = [os.path.join(path, name) for name in META_FILES if os.path.exists(os.path.join(path, name))]
+            return ",".join(self.file_hash(meta_file) for meta_file in meta_files) or "empty"
+        return self.file_hash(path) if os.path.exists(path) else "missing"
+
+    def fingerprint(self, stage):
+        # Contenu des entrées + code du script et de ses modules locaux. Une étape qui relit sa
+        # propre sortie (keywords) n'en dépend pas : la modifier à la main ne relance que l'aval
+        digest = hashlib.sha256()
+        for path in stage.inputs:
+            if path in stage.outputs:
+                continue
+            digest.update(path.encode("utf-8"))
+            digest.update(self.input_hash(path).encode("utf-8"))
+        for path in local_sources(stage.script):
+            digest.update(path.encode("utf-8"))
+            digest.update(self.file_hash(os.path.join(REPO_DIR, path)).encode("utf-8"))
+        return digest.hexdigest()
+
+
+def load_state(state_file=STATE_FILE):
+    if not os.path.exists(state_file):
+        return {"stages": {}, "hashes": {}}
+    with open(state_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, state_file=STATE_FILE):
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, state_file)
+
+
+def is_fresh(stage, fingerprint, state):
+    previous = state["stages"].get(stage.name)
+    return (
+        previous is not None
+        and previous["fingerprint"] == fingerprint
+        and all(os.path.exists(path) for path in stage.outputs)
+    )
+
+
+def run_script(stage, log_dir):
+    log_file = os.path.join(log_dir, f"{stage.name}.log")
+    start = time.perf_counter()
+    with open(log_file, "w", encoding="utf-8") as log:
+        returncode = subprocess.run(
+            [sys.executable, os.path.join(REPO_DIR, stage.script)], stdout=log, stderr=subprocess.STDOUT
+        ).returncode
+    return returncode, time.perf_counter() - start, log_file
+
+
+def select_stages(targets, stages=STAGES):
+    # Les étapes demandées et tout ce dont elles dépendent
+    deps = dependencies(stages)
+    selected, pending = set(), list(targets or [stage.name for stage in stages])
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(deps[name])
+    return [stage for stage in stages if stage.name in selected]
+
+
+def run_pipeline(targets=None, force=(), jobs=JOBS, dry_run=False, state_file=STATE_FILE, log_dir=LOG_DIR):
+    stages = select_stages(targets)
+    deps = dependencies(stages)
+    state = load_state(state_file)
+    hasher = ContentHasher(state["hashes"])
+    os.makedirs(log_dir, exist_ok=True)
+
+    results = {}  # nom → (statut, durée)
+    running = {}
+    done = set()
+
+    def ready():
+        return [
+            stage for stage in stages
+            if stage.name not in results and stage.name not in running.values() and deps[stage.name] <= done
+        ]
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(results) < len(stages):
+            progressed = False
+            for stage in ready():
+                progressed = True
+                upstream = [results[dep][0] for dep in deps[stage.name]]
+                if any(status in ("failed", "blocked") for status in upstream):
+                    results[stage.name] = ("blocked", 0.0)
+                    done.add(stage.name)
+                    continue
+
+                # Empreinte calculée une fois les étapes amont terminées : leurs sorties sont à jour
+                fingerprint = hasher.fingerprint(stage)
+                if stage.name not in force and "would run" not in upstream and is_fresh(stage, fingerprint, state):
+                    results[stage.name] = ("cached", 0.0)
+                    done.add(stage.name)
+                elif dry_run:
+                    results[stage.name] = ("would run", 0.0)
+                    done.add(stage.name)
+                else:
+                    print(f"▶️ {stage.name} ({stage.script})")
+                    running[executor.submit(run_script, stage, log_dir)] = stage.name
+
+            if not running:
+                if not progressed:
+                    raise RuntimeError("Dépendance circulaire entre étapes")
+                continue  # des étapes cached/blocked ont débloqué les suivantes
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                stage = next(stage for stage in stages if stage.name == name)
+                returncode, duration, log_file = future.result()
+                done.add(name)
+
+                if returncode != 0:
+                    results[name] = ("failed", duration)
+                    state["stages"].pop(name, None)
+                    print(f"❌ {name} a échoué (code {returncode}), voir {log_file}")
+                else:
+                    results[name] = ("ran", duration)
+                    state["stages"][name] = {
+                        "fingerprint": hasher.fingerprint(stage),
+                        "duration_s": duration,
+                        "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    }
+                    print(f"✅ {name} terminé en {duration:.1f} s")
+
+                state["hashes"] = hasher.known
+                save_state(state, state_file)
+
+    if not dry_run:
+        state["hashes"] = hasher.known
+        save_state(state, state_file)
+
+    print("\n⏱️ Résumé :")
+    for stage in stages:
+        status, duration = results[stage.name]
+        print(f"   {stage.name:11} {status:10} {duration:8.1f} s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lance le pipeline en ne refaisant que les étapes dont les entrées ou le code ont changé")
+    parser.add_argument("targets", nargs="*", help="étapes à produire (et leurs dépendances), toutes par défaut")
+    parser.add_argument("--force", nargs="+", default=[], metavar="STAGE", help="relancer ces étapes même si elles sont à jour")
+    parser.add_argument("--jobs", type=int, default=JOBS, help="étapes indépendantes lancées en parallèle")
+    parser.add_argument("--dry-run", action="store_true", help="affiche ce qui serait relancé sans rien exécuter")
+    args = parser.parse_args()
+
+    names = {stage.name for stage in STAGES}
+    unknown = [name for name in args.targets + args.force if name not in names]
+    if unknown:
+        parser.error(f"étapes inconnues : {unknown} (disponibles : {sorted(names)})")
+
+    results = run_pipeline(args.targets, set(args.force), args.jobs, args.dry_run)
+    if any(status in ("failed", "blocked") for status, _ in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
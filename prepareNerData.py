@@ -1,108 +1,221 @@
-import json
-import re
-import random
-from tqdm import tqdm
-from sklearn.model_selection import train_test_split
-from transformers import AutoTokenizer
-
-INPUT_FILE = "ner_dataset_raw.json"
-KEYWORD_FILE = "archetype_to_keywords.json"
-LABEL_LIST_FILE = "label_list.json"
-TOKENIZER_NAME = "bert-base-cased"
-DEBUG = False
-
-# Load files
-with open(INPUT_FILE, encoding="utf-8") as f:
-    raw_data = json.load(f)
-
-with open(KEYWORD_FILE, encoding="utf-8") as f:
-    archetype_to_keywords = json.load(f)
-
-with open(LABEL_LIST_FILE, encoding="utf-8") as f:
-    label_list = json.load(f)
-valid_labels = set(label_list)
-
-# Initialize tokenizer
-tokenizer = AutoTokenizer.from_pretrained(TOKENIZER_NAME)
-
-def normalize_archetype(archetype):
-    return archetype.replace(" ", "_").replace("-", "_")
-
-def annotate_tokens(text, tags):
-    encoding = tokenizer(text, return_offsets_mapping=True, return_tensors="pt", truncation=True)
-    tokens = tokenizer.convert_ids_to_tokens(encoding["input_ids"][0])[1:-1]  # Skip [CLS] and [SEP]
-    offsets = encoding["offset_mapping"][0].tolist()[1:-1]
-
-    labels = ["O"] * len(tokens)
-    token_tagged = [False] * len(tokens)
-    text_lower = text.lower()
-
-    for tag in tags:
-        if tag not in archetype_to_keywords:
-            continue  # Tag has no keywords
-        norm_tag = normalize_archetype(tag)
-        b_label = f"B-{norm_tag}"
-        i_label = f"I-{norm_tag}"
-
-        if b_label not in valid_labels:
-            continue  # Skip if tag is not in label list
-
-        for keyword in archetype_to_keywords[tag]:
-            pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-            for match in re.finditer(pattern, text_lower):
-                start, end = match.start(), match.end()
-                matched_tokens = []
-
-                for i, (tok_start, tok_end) in enumerate(offsets):
-                    if tok_end <= start:
-                        continue
-                    if tok_start >= end:
-                        break
-                    if tok_start < end and tok_end > start and not token_tagged[i]:
-                        matched_tokens.append(i)
-
-                if matched_tokens:
-                    labels[matched_tokens[0]] = b_label
-                    for i in matched_tokens[1:]:
-                        labels[i] = i_label
-                    for i in matched_tokens:
-                        token_tagged[i] = True
-
-                    if DEBUG:
-                        print(f"[DEBUG] Matched '{keyword}' as '{text[start:end]}' for tag '{tag}'")
-
-    return tokens, labels
-
-# Build the dataset
-ner_examples = []
-print("🔍 Annotating NER data...")
-for entry in tqdm(raw_data):
-    text = entry["text"]
-    tags = entry["tags"]
-    tokens, labels = annotate_tokens(text, tags)
-    ner_examples.append({"tokens": tokens, "labels": labels})
-
-# Shuffle and split
-random.seed(42)
-random.shuffle(ner_examples)
-
-n = len(ner_examples)
-train_split = int(n * 0.7)
-val_split = int(n * 0.85)
-
-train = ner_examples[:train_split]
-val = ner_examples[train_split:val_split]
-test = ner_examples[val_split:]
-
-# Save the datasets
-print("💾 Saving datasets...")
-with open("ner_train.json", "w", encoding="utf-8") as f:
-    json.dump(train, f, indent=2, ensure_ascii=False)
-
-with open("ner_val.json", "w", encoding="utf-8") as f:
-    json.dump(val, f, indent=2, ensure_ascii=False)
-
-with open("ner_test.json", "w", encoding="utf-8") as f:
-    json.dump(test, f, indent=2, ensure_ascii=False)
-
-print(f"✅ Done! Dataset sizes — train: {len(train)}, val: {len(val)}, test: {len(test)}")
+import hashlib
+import json
+import os
+import re
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from tqdm import tqdm
+from transformers import AutoTokenizer
+
+from cardSource import JsonArrayWriter, iter_json_array
+from nerShards import SHARD_DIR, ShardSetWriter, write_shards
+
+INPUT_FILE = "ner_dataset_raw.json"
+KEYWORD_FILE = "archetype_to_keywords.json"
+LABEL_LIST_FILE = "label_list.json"
+TOKENIZER_NAME = "bert-base-cased"
+NUM_WORKERS = os.cpu_count() or 1  # processus d'annotation
+BATCH_SIZE = 1000  # textes tokenisés par appel au tokenizer
+SPLIT_FILES = {"train": "ner_train.json", "validation": "ner_val.json", "test": "ner_test.json"}
+SPLIT_RATIOS = {"train": 0.7, "validation": 0.15, "test": 0.15}
+DEBUG = False
+
+# État de l'annotateur, initialisé une fois par processus
+tokenizer = None
+keyword_patterns = {}
+valid_labels = set()
+
+def normalize_archetype(archetype):
+    return archetype.replace(" ", "_").replace("-", "_")
+
+def compile_keyword_patterns(archetype_to_keywords):
+    # Une regex compilée par mot-clé, dans l'ordre du fichier
+    return {
+        tag: [(keyword, re.compile(r'\b' + re.escape(keyword.lower()) + r'\b')) for keyword in keywords]
+        for tag, keywords in archetype_to_keywords.items()
+    }
+
+def init_annotator(keyword_file=KEYWORD_FILE, label_list_file=LABEL_LIST_FILE, tokenizer_name=TOKENIZER_NAME):
+    global tokenizer, keyword_patterns, valid_labels
+
+    with open(keyword_file, encoding="utf-8") as f:
+        keyword_patterns = compile_keyword_patterns(json.load(f))
+
+    with open(label_list_file, encoding="utf-8") as f:
+        valid_labels = set(json.load(f))
+
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+
+def label_tokens(text, tags, offsets):
+    labels = ["O"] * len(offsets)
+    token_tagged = [False] * len(offsets)
+    text_lower = text.lower()
+
+    # Les offsets sont croissants : recherche dichotomique du premier token qui finit après le début du match
+    token_starts = [tok_start for tok_start, _ in offsets]
+    token_ends = [tok_end for _, tok_end in offsets]
+
+    for tag in tags:
+        if tag not in keyword_patterns:
+            continue  # Tag has no keywords
+        norm_tag = normalize_archetype(tag)
+        b_label = f"B-{norm_tag}"
+        i_label = f"I-{norm_tag}"
+
+        if b_label not in valid_labels:
+            continue  # Skip if tag is not in label list
+
+        for keyword, pattern in keyword_patterns[tag]:
+            for match in pattern.finditer(text_lower):
+                start, end = match.start(), match.end()
+                matched_tokens = []
+
+                i = bisect_right(token_ends, start)
+                while i < len(offsets) and token_starts[i] < end:
+                    if not token_tagged[i]:
+                        matched_tokens.append(i)
+                    i += 1
+
+                if matched_tokens:
+                    labels[matched_tokens[0]] = b_label
+                    for i in matched_tokens[1:]:
+                        labels[i] = i_label
+                    for i in matched_tokens:
+                        token_tagged[i] = True
+
+                    if DEBUG:
+                        print(f"[DEBUG] Matched '{keyword}' as '{text[start:end]}' for tag '{tag}'")
+
+    return labels
+
+def annotate_batch(entries):
+    texts = [entry["text"] for entry in entries]
+    encodings = tokenizer(texts, return_offsets_mapping=True, truncation=True)
+
+    examples = []
+    for entry, input_ids, offsets in zip(entries, encodings["input_ids"], encodings["offset_mapping"]):
+        tokens = tokenizer.convert_ids_to_tokens(input_ids)[1:-1]  # Skip [CLS] and [SEP]
+        labels = label_tokens(entry["text"], entry["tags"], offsets[1:-1])
+        example = {"tokens": tokens, "labels": labels}
+        if "oracle_id" in entry:
+            example = {"oracle_id": entry["oracle_id"], **example}
+        examples.append(example)
+    return examples
+
+def annotate_tokens(text, tags):
+    example = annotate_batch([{"text": text, "tags": tags}])[0]
+    return example["tokens"], example["labels"]
+
+def iter_batches(entries, batch_size):
+    iterator = iter(entries)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def bounded_map(executor, fn, items, max_pending):
+    # Comme executor.map, mais sans soumettre tout l'itérable d'avance : mémoire bornée
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def annotate_corpus(entries, num_workers=NUM_WORKERS, batch_size=BATCH_SIZE, annotator_args=()):
+    # annotator_args : arguments d'init_annotator (fichiers de mots-clés / labels, tokenizer)
+    # entries peut être un générateur : les exemples sortent dans l'ordre, au fil de l'eau
+    batches = iter_batches(entries, batch_size)
+    progress = tqdm(total=len(entries) if hasattr(entries, "__len__") else None)
+
+    if num_workers <= 1:
+        if tokenizer is None:
+            init_annotator(*annotator_args)
+        results = map(annotate_batch, batches)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=num_workers, initializer=init_annotator, initargs=annotator_args)
+        results = bounded_map(executor, annotate_batch, batches, max_pending=2 * num_workers)
+
+    try:
+        for batch_examples in results:
+            progress.update(len(batch_examples))
+            yield from batch_examples
+    finally:
+        progress.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def assign_split(key):
+    # Split déterministe tiré du hash de la clé (oracle_id) : stable d'une reconstruction à l'autre,
+    # et une carte ajoutée ne déplace aucune autre
+    position = int(hashlib.sha256(key.encode("utf-8")).hexdigest()[:8], 16) / 0x100000000
+    for split, ratio in SPLIT_RATIOS.items():
+        position -= ratio
+        if position < 0:
+            return split
+    return split
+
+def save_examples(examples, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(examples, f, indent=2, ensure_ascii=False)
+
+def save_shards(splits, tokenizer_name=TOKENIZER_NAME, label_list_file=LABEL_LIST_FILE, shard_dir=SHARD_DIR,
+                data_files=SPLIT_FILES):
+    # Même contenu que les JSON (déjà écrits), en ids int32 / int16 directement lisibles par trainNER
+    with open(label_list_file, encoding="utf-8") as f:
+        label_list = json.load(f)
+    return write_shards(splits, AutoTokenizer.from_pretrained(tokenizer_name), label_list, shard_dir,
+                        data_files=data_files)
+
+def main():
+    with open(LABEL_LIST_FILE, encoding="utf-8") as f:
+        label_list = json.load(f)
+
+    first = next(iter_json_array(INPUT_FILE), None)
+    if first is not None and "oracle_id" not in first:
+        raise SystemExit(f"❌ {INPUT_FILE} n'a pas d'oracle_id : relancer mergeTagsAndComs.py")
+
+    # Annotation en flux : chaque exemple part directement dans le JSON et les shards de son split.
+    # Les JSON sont écrits à côté et mis en place à la fin, comme les shards : un échec en cours
+    # de route laisse les splits précédents intacts
+    print("🔍 Annotating NER data...")
+    counts = dict.fromkeys(SPLIT_FILES, 0)
+    tmp_files = {split: path + ".tmp" for split, path in SPLIT_FILES.items()}
+    shard_set = ShardSetWriter(AutoTokenizer.from_pretrained(TOKENIZER_NAME), label_list, SPLIT_FILES)
+    try:
+        with ExitStack() as stack:
+            json_writers = {
+                split: JsonArrayWriter(stack.enter_context(open(path, "w", encoding="utf-8")))
+                for split, path in tmp_files.items()
+            }
+            for example in annotate_corpus(iter_json_array(INPUT_FILE)):
+                if "oracle_id" not in example:
+                    raise SystemExit(f"❌ {INPUT_FILE} n'a pas d'oracle_id : relancer mergeTagsAndComs.py")
+                split = assign_split(example["oracle_id"])
+                json_writers[split].write(example)
+                shard_set.add(split, example)
+                counts[split] += 1
+
+            for writer in json_writers.values():
+                writer.close()
+    except BaseException:
+        for path in tmp_files.values():
+            if os.path.exists(path):
+                os.remove(path)
+        shard_set.abort()
+        raise
+
+    for split, path in SPLIT_FILES.items():
+        os.replace(tmp_files[split], path)
+    shard_set.close(SPLIT_FILES)
+
+    print(f"✅ Done! Dataset sizes — train: {counts['train']}, val: {counts['validation']}, test: {counts['test']}")
+
+if __name__ == "__main__":
+    main()
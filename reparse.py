@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import zstandard
+
+from checkpointJournal import CheckpointJournal, load_checkpoint
+from edhrecParsers import parse_commander_tags_fast, parse_tag_cards_fast
+from pageArchive import ARCHIVE_DIR, PageArchive, read_page
+
+NUM_WORKERS = os.cpu_count() or 1
+CHUNK_SIZE = 32  # pages par tâche envoyée à un worker
+TAG_THRESHOLD = 5  # même seuil que gettags.py
+
+# Sorties reconstruites : type de page archivée -> fichier de cache du scraper correspondant
+# (getTagsAndCards.py et gettags.py ne sont pas importés : pas besoin de selenium / aiohttp hors ligne)
+OUTPUTS = {
+    "tag": "edhrec_tags_to_cards.json",
+    "commander": "commander_tags.json",
+}
+
+# État du worker, initialisé une fois par processus
+pages_fd = None
+decompressor = None
+threshold = TAG_THRESHOLD
+
+def init_worker(pages_file, tag_threshold):
+    global pages_fd, decompressor, threshold
+    pages_fd = os.open(pages_file, os.O_RDONLY)
+    decompressor = zstandard.ZstdDecompressor()
+    threshold = tag_threshold
+
+def parse_entry(entry):
+    if entry["kind"] == "commander" and entry.get("meta", {}).get("more_tags") is False:
+        return []  # Comme gettags : pas de champ "More Tags", pas de tags
+    html = read_page(pages_fd, entry, decompressor)
+    if entry["kind"] == "tag":
+        return parse_tag_cards_fast(html)
+    return parse_commander_tags_fast(html, threshold)
+
+def parse_chunk(entries):
+    return [(entry["kind"], entry["key"], parse_entry(entry)) for entry in entries]
+
+def reparse(archive, kinds=tuple(OUTPUTS), num_workers=NUM_WORKERS, tag_threshold=TAG_THRESHOLD):
+    """{type: {clé: résultat}} pour la dernière version de chaque page archivée des types demandés."""
+    entries = [entry for entry in archive.latest() if entry["kind"] in kinds]
+    chunks = [entries[i:i + CHUNK_SIZE] for i in range(0, len(entries), CHUNK_SIZE)]
+    results = {kind: {} for kind in kinds}
+    if not entries:
+        return results  # archive vide ou absente (--dry-run ne la crée pas)
+
+    def collect(parsed_chunks):
+        for chunk in parsed_chunks:
+            for kind, key, value in chunk:
+                results[kind][key] = value
+        return results
+
+    if num_workers <= 1:
+        init_worker(archive.pages_file, tag_threshold)
+        return collect(map(parse_chunk, chunks))
+
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=init_worker,
+                             initargs=(archive.pages_file, tag_threshold)) as executor:
+        return collect(executor.map(parse_chunk, chunks))
+
+def write_cache(path, data):
+    # Snapshot écrit de façon atomique ; le journal a déjà été rejoué par load_cache, il est vide
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    if os.path.exists(f"{path}.journal"):
+        os.remove(f"{path}.journal")
+
+def load_cache(path, compact=True):
+    # Snapshot + journal d'un scraping interrompu, comme le scraper les verrait ; compact=False
+    # (--dry-run) relit les deux sans rien créer ni tronquer
+    if not compact:
+        return load_checkpoint(path)
+    if not os.path.exists(path) and not os.path.exists(f"{path}.journal"):
+        return {}
+    journal = CheckpointJournal(path)
+    journal.close()
+    return journal.data
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reconstruit edhrec_tags_to_cards.json et commander_tags.json depuis l'archive, sans réseau"
+    )
+    parser.add_argument("kinds", nargs="*", default=list(OUTPUTS), help=f"parmi {', '.join(OUTPUTS)} (défaut : tous)")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    parser.add_argument("--threshold", type=int, default=TAG_THRESHOLD, help="decks min. pour un tag de commandant")
+    parser.add_argument("--clean", action="store_true", help="ne pas garder les entrées absentes de l'archive")
+    parser.add_argument("--dry-run", action="store_true", help="compare au cache actuel sans l'écrire")
+    args = parser.parse_args()
+
+    unknown = set(args.kinds) - set(OUTPUTS)
+    if unknown:
+        parser.error(f"types inconnus : {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    with PageArchive(args.archive_dir, read_only=args.dry_run) as archive:
+        results = reparse(archive, tuple(args.kinds), args.workers, args.threshold)
+    elapsed = time.perf_counter() - start
+    pages = sum(len(parsed) for parsed in results.values())
+    print(f"⚡ {pages} pages re-parsées en {elapsed:.2f} s ({pages / max(elapsed, 1e-9):.0f} pages/s, {args.workers} workers)")
+
+    for kind, parsed in results.items():
+        path = OUTPUTS[kind]
+        current = load_cache(path, compact=not args.dry_run)
+        changed = sum(1 for key, value in parsed.items() if key in current and sorted(current[key]) != sorted(value))
+        added = sum(1 for key in parsed if key not in current)
+        missing = [key for key in current if key not in parsed]
+
+        # Les pages récupérées avant l'archive n'y sont pas : on garde leur entrée, sauf --clean
+        data = parsed if args.clean else {**current, **parsed}
+        print(f"📄 {path} : {len(parsed)} pages, {added} nouvelles, {changed} modifiées, "
+              f"{len(missing)} absentes de l'archive ({'supprimées' if args.clean else 'gardées'})")
+        if not args.dry_run:
+            write_cache(path, data)
+
+    if args.dry_run:
+        print("🔎 --dry-run : aucun fichier écrit")
+
+if __name__ == "__main__":
+    main()
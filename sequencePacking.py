@@ -0,0 +1,109 @@
+from bisect import bisect_left, insort
+
+import torch
+import transformers
+
+# transformers 4.x accepte un masque 3D (get_extended_attention_mask) ; 5.x attend un masque 4D,
+# booléen pour l'attention sdpa (implémentation par défaut de BERT)
+MASK_4D = int(transformers.__version__.split(".")[0]) >= 5
+
+
+def pack_lengths(lengths, max_length):
+    """
+    Répartit des exemples de longueurs `lengths` en groupes d'au plus `max_length` tokens
+    (best-fit decreasing). Renvoie une liste de groupes d'indices.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    groups = []
+    free = []  # (place restante, index du groupe), trié
+
+    for i in order:
+        length = min(lengths[i], max_length)
+        pos = bisect_left(free, (length, -1))
+        if pos < len(free):
+            remaining, group = free.pop(pos)
+        else:
+            remaining, group = max_length, len(groups)
+            groups.append([])
+        groups[group].append(i)
+        remaining -= length
+        if remaining > 0:
+            insort(free, (remaining, group))
+
+    return groups
+
+
+class PackedDataset(torch.utils.data.Dataset):
+    """
+    Concatène plusieurs exemples tokenisés courts dans une même séquence.
+
+    Chaque exemple garde son [CLS]/[SEP] (labels à -100, donc hors de la loss) et ses
+    propres position_ids qui repartent de 0 : PackedDataCollator s'en sert pour
+    construire un masque d'attention bloc-diagonal, sans fuite entre exemples.
+    """
+
+    def __init__(self, dataset, max_length):
+        self.dataset = dataset
+        # NerShardDataset donne les longueurs sans lire les séquences
+        lengths = dataset.lengths() if hasattr(dataset, "lengths") else [len(ids) for ids in dataset["input_ids"]]
+        self.groups = pack_lengths(lengths, max_length)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __getitem__(self, index):
+        input_ids, labels, position_ids = [], [], []
+        for i in self.groups[index]:
+            example = self.dataset[i]
+            input_ids.extend(example["input_ids"])
+            labels.extend(example["labels"])
+            position_ids.extend(range(len(example["input_ids"])))
+        return {"input_ids": input_ids, "labels": labels, "position_ids": position_ids}
+
+
+class PackedDataCollator:
+    """
+    Padding dynamique + masque d'attention 3D (batch × séquence × séquence) bloc-diagonal.
+    Les exemples non packés (évaluation) forment un seul bloc : résultat identique au
+    masque 2D habituel.
+    """
+
+    def __init__(self, tokenizer, label_pad_token_id=-100):
+        self.pad_token_id = tokenizer.pad_token_id
+        self.label_pad_token_id = label_pad_token_id
+
+    def __call__(self, features):
+        batch_size = len(features)
+        max_len = max(len(feature["input_ids"]) for feature in features)
+
+        input_ids = torch.full((batch_size, max_len), self.pad_token_id, dtype=torch.long)
+        labels = torch.full((batch_size, max_len), self.label_pad_token_id, dtype=torch.long)
+        position_ids = torch.zeros((batch_size, max_len), dtype=torch.long)
+        attention_mask = torch.zeros((batch_size, max_len, max_len), dtype=torch.long)
+
+        for b, feature in enumerate(features):
+            length = len(feature["input_ids"])
+            input_ids[b, :length] = torch.tensor(feature["input_ids"], dtype=torch.long)
+            labels[b, :length] = torch.tensor(feature["labels"], dtype=torch.long)
+
+            positions = feature.get("position_ids") or list(range(length))
+            position_ids[b, :length] = torch.tensor(positions, dtype=torch.long)
+
+            starts = [i for i, position in enumerate(positions) if position == 0] + [length]
+            for start, end in zip(starts, starts[1:]):
+                attention_mask[b, start:end, start:end] = 1
+
+            # Les positions de padding ne voient qu'elles-mêmes (évite les lignes entièrement masquées)
+            pad = torch.arange(length, max_len)
+            attention_mask[b, pad, pad] = 1
+
+        if MASK_4D:
+            attention_mask = attention_mask[:, None].bool()
+
+        return {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": torch.zeros_like(input_ids),
+            "position_ids": position_ids,
+            "labels": labels,
+        }
@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import random
+import uuid
+
+from buildArchetypeToKeyword import OUTPUT_FILE as KEYWORD_FILE
+from cardSource import ORACLE_FILE, dump_json_array
+from createLabelList import OUTPUT_FILE as LABEL_LIST_FILE, build_label_list
+from mergeTagsAndComs import TAGS_FILE
+
+FIXTURE_DIR = "fixtures"
+META_FILE = "fixture_meta.json"
+NUM_CARDS = 10_000
+NUM_TAGS = 200
+SEED = 42
+
+# Vocabulaire des textes synthétiques : assez varié pour que les mots-clés ne matchent pas partout
+ADJECTIVES = (
+    "Ancient", "Blazing", "Crimson", "Dread", "Emerald", "Feral", "Gilded", "Hollow", "Iron", "Jade",
+    "Keen", "Lunar", "Molten", "Noble", "Obsidian", "Pale", "Radiant", "Silent", "Twisted", "Verdant",
+)
+NOUNS = (
+    "Archon", "Behemoth", "Champion", "Drake", "Emissary", "Familiar", "Golem", "Harbinger", "Inquisitor",
+    "Juggernaut", "Knight", "Leviathan", "Mystic", "Nomad", "Oracle", "Paladin", "Revenant", "Sentinel",
+    "Tyrant", "Warden",
+)
+SUBTYPES = ("Human", "Elf", "Goblin", "Zombie", "Vampire", "Dragon", "Angel", "Merfolk", "Wizard", "Warrior")
+CARD_TYPES = ("Instant", "Sorcery", "Artifact", "Enchantment", "Land", "Planeswalker")
+VERBS = (
+    "sacrifice", "exile", "destroy", "return", "draw", "discard", "create", "copy", "mill", "tap",
+    "untap", "reveal", "scry", "surveil", "proliferate", "counter", "fight", "transform", "investigate", "populate",
+)
+OBJECTS = (
+    "token", "artifact", "enchantment", "creature", "land", "spell", "graveyard", "library", "counter", "treasure",
+    "clue", "food", "aura", "equipment", "vehicle", "saga", "rune", "shard", "totem", "relic",
+)
+FILLER = (
+    "When this enters, {verb} a {obj}.",
+    "At the beginning of your upkeep, you may {verb} target {obj}.",
+    "Whenever a {obj} you control dies, {verb} a {obj}.",
+    "{{T}}: {verb} up to two target {obj}s.",
+    "Each opponent loses 1 life for each {obj} you control.",
+)
+LEGALITY_FORMATS = ("standard", "modern", "legacy", "vintage", "commander", "pauper")
+
+
+def card_name(index):
+    # Unique et déterministe pour un index donné : les tags EDHREC y font référence
+    return f"{ADJECTIVES[index % 20]} {NOUNS[index // 20 % 20]} {index}"
+
+
+def tag_name(index):
+    return f"{VERBS[index % 20]} {OBJECTS[index // 20 % 20]}" + (f" {index // 400}" if index >= 400 else "")
+
+
+def build_archetype_to_keywords(num_tags, rng):
+    # 1 à 3 mots-clés par tag, le premier étant le nom du tag lui-même
+    archetype_to_keywords = {}
+    for i in range(num_tags):
+        tag = tag_name(i)
+        extra = [f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}s" for _ in range(rng.randint(0, 2))]
+        archetype_to_keywords[tag] = [tag] + [keyword for keyword in extra if keyword != tag]
+    return archetype_to_keywords
+
+
+def build_card(index, keywords, rng):
+    roll = rng.random()
+    if roll < 0.15:
+        type_line = f"Legendary Creature — {rng.choice(SUBTYPES)} {rng.choice(SUBTYPES)}"
+    elif roll < 0.55:
+        type_line = f"Creature — {rng.choice(SUBTYPES)}"
+    else:
+        type_line = rng.choice(CARD_TYPES)
+
+    sentences = [
+        rng.choice(FILLER).format(verb=rng.choice(VERBS), obj=rng.choice(OBJECTS))
+        for _ in range(rng.randint(1, 4))
+    ]
+    # Environ une carte sur deux contient un mot-clé d'archétype tel quel
+    if rng.random() < 0.5:
+        sentences.insert(rng.randrange(len(sentences) + 1), f"You may {rng.choice(keywords)} this turn.")
+
+    legalities = {fmt: "legal" if rng.random() < 0.9 else rng.choice(("not_legal", "banned")) for fmt in LEGALITY_FORMATS}
+    card = {
+        "object": "card",
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "oracle_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "name": card_name(index),
+        "mana_cost": "{" + str(rng.randint(1, 6)) + "}",
+        "cmc": float(rng.randint(1, 7)),
+        "type_line": type_line,
+        "oracle_text": "\n".join(sentences),
+        "legalities": legalities,
+    }
+    if type_line == "Land":
+        del card["oracle_text"]  # comme certaines cartes Scryfall sans texte
+    return card
+
+
+def generate_fixtures(output_dir=FIXTURE_DIR, num_cards=NUM_CARDS, num_tags=NUM_TAGS, seed=SEED):
+    """
+    Génère dans `output_dir` un jeu de fichiers aux noms attendus par les scripts :
+    dump Scryfall, tags EDHREC, mots-clés par archétype et label list.
+    Même graine et mêmes tailles → mêmes fichiers, octet pour octet.
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    archetype_to_keywords = build_archetype_to_keywords(num_tags, rng)
+    keywords = [keyword for tag_keywords in archetype_to_keywords.values() for keyword in tag_keywords]
+
+    # Carte par carte : 1M cartes ne passent jamais par une liste en mémoire
+    with open(os.path.join(output_dir, ORACLE_FILE), "w", encoding="utf-8") as f:
+        dump_json_array((build_card(i, keywords, rng) for i in range(num_cards)), f)
+
+    # Chaque tag EDHREC référence 0,5 % à 3 % des cartes
+    tags_to_cards = {}
+    for tag in archetype_to_keywords:
+        size = max(1, int(num_cards * rng.uniform(0.005, 0.03)))
+        tags_to_cards[tag] = [card_name(i) for i in sorted(rng.sample(range(num_cards), size))]
+
+    with open(os.path.join(output_dir, TAGS_FILE), "w", encoding="utf-8") as f:
+        json.dump(tags_to_cards, f, indent=2, ensure_ascii=False)
+
+    with open(os.path.join(output_dir, KEYWORD_FILE), "w", encoding="utf-8") as f:
+        json.dump(archetype_to_keywords, f, indent=2, ensure_ascii=False)
+
+    with open(os.path.join(output_dir, LABEL_LIST_FILE), "w", encoding="utf-8") as f:
+        json.dump(build_label_list(tags_to_cards), f, indent=2)
+
+    meta = {"num_cards": num_cards, "num_tags": num_tags, "seed": seed}
+    with open(os.path.join(output_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_meta(fixture_dir=FIXTURE_DIR):
+    with open(os.path.join(fixture_dir, META_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère des fixtures Scryfall / EDHREC synthétiques et déterministes")
+    parser.add_argument("--output-dir", default=FIXTURE_DIR)
+    parser.add_argument("--cards", type=int, default=NUM_CARDS)
+    parser.add_argument("--tags", type=int, default=NUM_TAGS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    meta = generate_fixtures(args.output_dir, args.cards, args.tags, args.seed)
+    print(f"✅ {meta['num_cards']} cartes et {meta['num_tags']} tags générés dans {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
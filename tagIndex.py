@@ -0,0 +1,268 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+INDEX_DIR = "tag_index"
+TAGS_FILE = "edhrec_tags_to_cards.json"
+ENTITIES = ("cards", "tags")
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_sha256(path):
+    # Lu par blocs : les dumps Scryfall font plusieurs centaines de Mo
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_meta(path):
+    """Champs meta.json qui identifient le fichier source d'un index ou d'un store."""
+    stat = os.stat(path)
+    return {
+        "source": os.path.basename(path),
+        "source_sha256": file_sha256(path),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def source_matches(meta, path):
+    # sha256 mémorisé par (taille, mtime) comme dans pipeline.ContentHasher : pas de relecture
+    # du fichier tant qu'il n'a pas été touché
+    stat = os.stat(path)
+    if [meta.get("source_size"), meta.get("source_mtime_ns")] == [stat.st_size, stat.st_mtime_ns]:
+        return True
+    return meta.get("source_sha256") == file_sha256(path)
+
+
+# ====== CONSTRUCTION ======
+
+def _save_names(index_dir, entity, names):
+    # Noms d'affichage (offsets + UTF-8) et clés minuscules triées pour la recherche
+    encoded = [name.encode("utf-8") for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded], dtype=np.int64)
+    np.save(os.path.join(index_dir, f"{entity}.offsets.npy"), offsets)
+    np.save(os.path.join(index_dir, f"{entity}.data.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    keys = np.array([name.lower().encode("utf-8") for name in names], dtype=bytes)
+    order = np.argsort(keys, kind="stable").astype(np.int32)
+    np.save(os.path.join(index_dir, f"{entity}.keys.npy"), keys[order])
+    np.save(os.path.join(index_dir, f"{entity}.key_ids.npy"), order)
+
+
+def _save_csr(index_dir, name, rows, num_rows):
+    # Listes d'adjacence triées au format CSR : indptr int64 + indices int32
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in rows], dtype=np.int64)
+    indices = np.fromiter((i for row in rows for i in sorted(row)), dtype=np.int32, count=int(indptr[-1]))
+    np.save(os.path.join(index_dir, f"{name}.indptr.npy"), indptr)
+    np.save(os.path.join(index_dir, f"{name}.indices.npy"), indices)
+
+
+def build_index(tags_file=TAGS_FILE, index_dir=INDEX_DIR):
+    """
+    Index carte ↔ tag à partir de edhrec_tags_to_cards.json. Les cartes sont internées
+    sans tenir compte de la casse, comme dans mergeTagsAndComs.build_card_name_to_tags.
+    """
+    with open(tags_file, "r", encoding="utf-8") as f:
+        tag_to_cards = json.load(f)
+
+    card_ids = {}
+    card_names = []
+    tag_names = list(tag_to_cards)
+    tag_rows = []
+    for card_list in tag_to_cards.values():
+        row = set()
+        for name in card_list:
+            card_id = card_ids.get(name.lower())
+            if card_id is None:
+                card_id = card_ids[name.lower()] = len(card_names)
+                card_names.append(name)
+            row.add(card_id)
+        tag_rows.append(row)
+
+    card_rows = [[] for _ in card_names]
+    for tag_id, row in enumerate(tag_rows):
+        for card_id in row:
+            card_rows[card_id].append(tag_id)
+
+    os.makedirs(index_dir, exist_ok=True)
+    _save_names(index_dir, "cards", card_names)
+    _save_names(index_dir, "tags", tag_names)
+    _save_csr(index_dir, "tag_cards", tag_rows, len(tag_names))
+    _save_csr(index_dir, "card_tags", card_rows, len(card_names))
+
+    meta = {
+        **source_meta(tags_file),
+        "cards": len(card_names),
+        "tags": len(tag_names),
+        "links": sum(len(row) for row in tag_rows),
+    }
+    with open(os.path.join(index_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    return meta
+
+
+def is_fresh(index_dir=INDEX_DIR, tags_file=TAGS_FILE):
+    """Vrai si l'index existe et a été construit à partir du contenu actuel de `tags_file`."""
+    meta_file = os.path.join(index_dir, "meta.json")
+    if not os.path.exists(meta_file):
+        return False
+    with open(meta_file, encoding="utf-8") as f:
+        meta = json.load(f)
+    return source_matches(meta, tags_file)
+
+
+# ====== LECTURE ======
+
+def _load(index_dir, name):
+    # Vue ndarray simple sur le mmap : évite le surcoût de np.memmap à chaque découpage
+    return np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r").view(np.ndarray)
+
+
+class NameTable:
+    """Noms internés : id → nom d'affichage, nom (casse ignorée) → id par recherche dichotomique."""
+
+    def __init__(self, index_dir, entity):
+        self._offsets = _load(index_dir, f"{entity}.offsets")
+        self._data = _load(index_dir, f"{entity}.data")
+        self._keys = _load(index_dir, f"{entity}.keys")
+        self._key_ids = _load(index_dir, f"{entity}.key_ids")
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def name(self, i):
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return self._data[start:end].tobytes().decode("utf-8")
+
+    def names(self, ids):
+        return [self.name(int(i)) for i in ids]
+
+    def id(self, name):
+        key = name.lower().encode("utf-8")
+        if not key or len(key) > self._keys.dtype.itemsize:
+            return None
+        pos = int(np.searchsorted(self._keys, key))
+        if pos < len(self._keys) and self._keys[pos] == key:
+            return int(self._key_ids[pos])
+        return None
+
+
+class TagIndex:
+    def __init__(self, index_dir=INDEX_DIR):
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.cards = NameTable(index_dir, "cards")
+        self.tags = NameTable(index_dir, "tags")
+        self._csr = {
+            name: (_load(index_dir, f"{name}.indptr"), _load(index_dir, f"{name}.indices"))
+            for name in ("tag_cards", "card_tags")
+        }
+
+    def _row(self, name, i):
+        indptr, indices = self._csr[name]
+        return indices[indptr[i]:indptr[i + 1]]
+
+    # ------ ids ------
+
+    def card_ids(self, tag):
+        tag_id = self.tags.id(tag)
+        return self._row("tag_cards", tag_id) if tag_id is not None else np.empty(0, dtype=np.int32)
+
+    def tag_ids(self, card):
+        card_id = self.cards.id(card)
+        return self._row("card_tags", card_id) if card_id is not None else np.empty(0, dtype=np.int32)
+
+    def intersection_ids(self, tags):
+        # Lignes CSR triées et sans doublon : intersection en commençant par la plus courte
+        rows = sorted((self.card_ids(tag) for tag in tags), key=len)
+        if not rows:
+            return np.empty(0, dtype=np.int32)
+        result = np.asarray(rows[0])
+        for row in rows[1:]:
+            result = np.intersect1d(result, row, assume_unique=True)
+        return result
+
+    def union_ids(self, tags):
+        rows = [self.card_ids(tag) for tag in tags]
+        return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int32)
+
+    def tag_card_csr(self):
+        """(indptr, indices) de la relation tag → cartes, pour construire une matrice creuse."""
+        return self._csr["tag_cards"]
+
+    # ------ noms ------
+
+    def tags_of(self, card):
+        return self.tags.names(self.tag_ids(card))
+
+    def cards_of(self, tag):
+        return self.cards.names(self.card_ids(tag))
+
+    def cards_in_all(self, tags):
+        return self.cards.names(self.intersection_ids(tags))
+
+    def cards_in_any(self, tags):
+        return self.cards.names(self.union_ids(tags))
+
+    def get(self, name, default=None):
+        # Interface de dict : remplace card_name_to_tags dans mergeTagsAndComs.tag_card
+        card_id = self.cards.id(name)
+        if card_id is None:
+            return default
+        return self.tags.names(self._row("card_tags", card_id))
+
+
+def open_index(index_dir=INDEX_DIR):
+    return TagIndex(index_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index carte ↔ tag EDHREC : construction et requêtes")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="construit l'index depuis le JSON des tags")
+    build_parser.add_argument("tags_file", nargs="?", default=TAGS_FILE)
+
+    card_parser = subparsers.add_parser("card", help="tags d'une carte")
+    card_parser.add_argument("name")
+
+    tag_parser = subparsers.add_parser("tags", help="cartes présentes dans tous les tags donnés (ou l'un d'eux avec --any)")
+    tag_parser.add_argument("tags", nargs="+")
+    tag_parser.add_argument("--any", action="store_true", help="union au lieu de l'intersection")
+    tag_parser.add_argument("--limit", type=int, default=50, help="nombre de cartes affichées")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        meta = build_index(args.tags_file, args.index_dir)
+        print(f"✅ Index {args.index_dir} généré : {meta['cards']} cartes, {meta['tags']} tags, {meta['links']} liens.")
+        return
+
+    index = open_index(args.index_dir)
+    start = time.perf_counter()
+    if args.command == "card":
+        results = index.tags_of(args.name)
+        label = f"tags de {args.name}"
+    else:
+        results = index.cards_in_any(args.tags) if args.any else index.cards_in_all(args.tags)
+        label = f"cartes dans {' ou '.join(args.tags) if args.any else ' et '.join(args.tags)}"
+    elapsed = time.perf_counter() - start
+
+    print(f"🔎 {len(results)} {label} ({elapsed * 1e6:.0f} µs)")
+    for name in results[:getattr(args, "limit", None) or len(results)]:
+        print(f"   {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import json
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from tagIndex import INDEX_DIR, TAGS_FILE, build_index, is_fresh, open_index
+
+OUTPUT_FILE = "label_merge_suggestions.json"
+JACCARD_THRESHOLD = 0.7  # au-delà, deux tags désignent à peu près les mêmes cartes
+CONTAINMENT_THRESHOLD = 0.95  # part du plus petit tag incluse dans le plus grand
+MIN_CARDS = 5  # en dessous, l'inclusion d'un petit tag n'est pas significative
+TOP_K = 5
+
+
+def tag_matrix(index):
+    """Matrice creuse tags × cartes (1 si la carte est dans le tag), sur les tableaux CSR de l'index."""
+    indptr, indices = index.tag_card_csr()
+    data = np.ones(len(indices), dtype=np.int32)
+    return csr_matrix((data, np.asarray(indices), np.asarray(indptr)), shape=(len(index.tags), len(index.cards)))
+
+
+def cooccurrence(matrix):
+    # co[i, j] = nombre de cartes communes aux tags i et j ; la diagonale donne la taille des tags
+    return (matrix @ matrix.T).toarray()
+
+
+def jaccard(co):
+    sizes = np.diag(co)
+    union = sizes[:, None] + sizes[None, :] - co
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, co / union, 0.0)
+
+
+def containment(co):
+    # |A ∩ B| / min(|A|, |B|) : 1 quand un tag est entièrement inclus dans l'autre
+    sizes = np.diag(co)
+    smaller = np.minimum(sizes[:, None], sizes[None, :])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(smaller > 0, co / smaller, 0.0)
+
+
+def top_k(similarity, k=TOP_K):
+    """Pour chaque tag, les k tags les plus proches (lui-même exclu) et leurs scores, triés."""
+    similarity = similarity.copy()
+    np.fill_diagonal(similarity, -1.0)
+    k = min(k, len(similarity) - 1)
+    if k <= 0:
+        return np.empty((len(similarity), 0), dtype=np.int64), np.empty((len(similarity), 0))
+    candidates = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(similarity, candidates, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def merge_suggestions(tag_names, co, jaccard_threshold=JACCARD_THRESHOLD,
+                      containment_threshold=CONTAINMENT_THRESHOLD, min_cards=MIN_CARDS):
+    """
+    Paires de tags redondants (Jaccard ou inclusion au-dessus du seuil) et groupes de tags
+    à fusionner (composantes connexes de ces paires). Chaque groupe propose de garder
+    son tag le plus grand.
+    """
+    sizes = np.diag(co)
+    jac = jaccard(co)
+    cont = containment(co)
+
+    redundant = (jac >= jaccard_threshold) | (
+        (cont >= containment_threshold) & (np.minimum(sizes[:, None], sizes[None, :]) >= min_cards)
+    )
+    redundant = np.triu(redundant, k=1)
+    rows, cols = np.nonzero(redundant)
+
+    pairs = sorted(
+        (
+            {
+                "tags": [tag_names[i], tag_names[j]],
+                "jaccard": round(float(jac[i, j]), 4),
+                "containment": round(float(cont[i, j]), 4),
+                "shared": int(co[i, j]),
+                "sizes": [int(sizes[i]), int(sizes[j])],
+            }
+            for i, j in zip(rows, cols)
+        ),
+        key=lambda pair: (-pair["jaccard"], -pair["containment"]),
+    )
+
+    graph = csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=co.shape)
+    _, component = connected_components(graph, directed=False)
+    groups = []
+    for label in np.unique(component[np.union1d(rows, cols)]):
+        members = np.flatnonzero(component == label)
+        members = members[np.argsort(-sizes[members], kind="stable")]
+        groups.append({"keep": tag_names[members[0]], "merge": [tag_names[i] for i in members[1:]]})
+
+    return pairs, groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Similarité entre tags EDHREC et suggestions de fusion de labels")
+    parser.add_argument("--tags-file", default=TAGS_FILE)
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--jaccard", type=float, default=JACCARD_THRESHOLD)
+    parser.add_argument("--containment", type=float, default=CONTAINMENT_THRESHOLD)
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--tag", action="append", default=[], help="affiche les tags les plus proches de celui-ci")
+    args = parser.parse_args()
+
+    if not is_fresh(args.index_dir, args.tags_file):
+        build_index(args.tags_file, args.index_dir)
+    index = open_index(args.index_dir)
+    tag_names = index.tags.names(range(len(index.tags)))
+
+    co = cooccurrence(tag_matrix(index))
+    print(f"📊 Co-occurrence {co.shape[0]}×{co.shape[1]} tags sur {len(index.cards)} cartes")
+
+    neighbours, scores = top_k(jaccard(co), args.top_k)
+    for tag in args.tag:
+        tag_id = index.tags.id(tag)
+        if tag_id is None:
+            print(f"⚠️ Tag inconnu : {tag}")
+            continue
+        print(f"🔎 Plus proches de {tag_names[tag_id]} :")
+        for neighbour, score in zip(neighbours[tag_id], scores[tag_id]):
+            print(f"   {tag_names[neighbour]:40} Jaccard {score:.3f}")
+
+    pairs, groups = merge_suggestions(tag_names, co, args.jaccard, args.containment)
+    suggestions = {
+        "jaccard_threshold": args.jaccard,
+        "containment_threshold": args.containment,
+        "groups": groups,
+        "pairs": pairs,
+        "nearest": {
+            tag_names[i]: [
+                {"tag": tag_names[j], "jaccard": round(float(s), 4)} for j, s in zip(neighbours[i], scores[i])
+            ]
+            for i in range(len(tag_names))
+        },
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(suggestions, f, indent=2, ensure_ascii=False)
+
+    print(f"✅ {len(pairs)} paires redondantes, {len(groups)} groupes à fusionner → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Sorties communes à l'entraînement et à l'inférence, sans dépendance lourde :
+# inferenceNERmtgArch l'importe sans tirer transformers.Trainer
+TELEMETRY_DIR = "telemetry"
+METRIC_PREFIX = "mtg_ner"
+
+
+def peak_memory_bytes():
+    # Pic de mémoire GPU si torch utilise CUDA, sinon pic de RSS du processus
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available() and torch.cuda.is_initialized():
+        return torch.cuda.max_memory_allocated()
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class JsonlLog:
+    """Un événement JSON par ligne, horodaté, écrit immédiatement (lisible pendant le run)."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def write(self, event, **fields):
+        line = json.dumps({"ts": time.time(), "event": event, **fields}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+def format_prometheus(metrics):
+    """
+    `metrics` au format texte Prometheus : {nom: (type, aide, valeur)}, la valeur étant un
+    nombre ou un dict {((label, valeur), ...): nombre}.
+    """
+    lines = []
+    for name, (metric_type, help_text, value) in sorted(metrics.items()):
+        full_name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        samples = value.items() if isinstance(value, dict) else [((), value)]
+        for labels, sample in samples:
+            if sample is None:
+                continue
+            label_text = ",".join(f'{key}="{val}"' for key, val in labels)
+            lines.append(f"{full_name}{{{label_text}}} {sample}" if label_text else f"{full_name} {sample}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, metrics):
+    # Écriture atomique, pour le textfile collector de node_exporter
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(format_prometheus(metrics))
+    os.replace(tmp_path, path)
+
+
+class StageTimer:
+    """Temps cumulé par étape (tokenizer, forward, post-traitement) et compteurs associés."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.seconds = defaultdict(float)
+            self.counts = defaultdict(int)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.seconds[name] += elapsed
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def snapshot(self):
+        with self._lock:
+            total = sum(self.seconds.values())
+            return {
+                "seconds": dict(self.seconds),
+                "share": {name: s / total for name, s in self.seconds.items()} if total else {},
+                "counts": dict(self.counts),
+            }
+
+    def prometheus_metrics(self, scope):
+        snapshot = self.snapshot()
+        return {
+            f"{scope}_stage_seconds_total": (
+                "counter", f"Temps cumulé par étape ({scope})",
+                {(("stage", name),): round(s, 6) for name, s in snapshot["seconds"].items()},
+            ),
+            f"{scope}_items_total": (
+                "counter", f"Compteurs ({scope})",
+                {(("item", name),): n for name, n in snapshot["counts"].items()},
+            ),
+        }
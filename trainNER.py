@@ -1,163 +1,409 @@
-import json
-import torch
-from datasets import load_dataset
-from transformers import (
-    AutoTokenizer,
-    AutoModelForTokenClassification,
-    DataCollatorForTokenClassification,
-    TrainingArguments,
-    Trainer,
-    AutoConfig,
-    TrainerCallback,
-)
-import evaluate
-
-print(torch.cuda.is_available())  # Should print: True
-print(torch.cuda.get_device_name(0))  # Should print something like: NVIDIA GeForce RTX 4070
-
-class F1LoggerCallback(TrainerCallback):
-    def __init__(self):
-        self.f1_scores = []
-
-    def on_evaluate(self, args, state, control, metrics, **kwargs):
-        f1 = metrics.get("eval_overall_f1")
-        if f1 is not None:
-            self.f1_scores.append((state.epoch, f1))
-            print(f"📊 F1 (epoch {state.epoch:.2f}): {f1:.4f}")
-
-# ========== CHARGEMENT DU DATASET ==========
-dataset = load_dataset(
-    "json",
-    data_files={
-        "train": "ner_train.json",
-        "validation": "ner_val.json",
-        "test": "ner_test.json"
-    },
-    field=None
-)
-
-print(f"Train size: {len(dataset['train'])}")
-print(f"Validation size: {len(dataset['validation'])}")
-print(f"Test size: {len(dataset['test'])}")
-
-# ========== ENCODAGE DES LABELS ==========
-with open("label_list.json", "r") as f:
-    label_list = json.load(f)
-
-label_to_id = {label: i for i, label in enumerate(label_list)}
-id_to_label = {i: label for label, i in label_to_id.items()}
-
-# ========== TOKENIZER ==========
-model_checkpoint = "bert-base-cased"
-tokenizer = AutoTokenizer.from_pretrained(model_checkpoint)
-
-def tokenize_and_align_labels(example):
-    tokenized = tokenizer(
-        example["tokens"],
-        is_split_into_words=True,
-        truncation=True,
-        padding="max_length",
-        max_length=128
-    )
-
-    word_ids = tokenized.word_ids()
-    label_ids = []
-    previous_word_idx = None
-
-    for word_idx in word_ids:
-        if word_idx is None:
-            label_ids.append(-100)
-        elif word_idx != previous_word_idx:
-            label_ids.append(label_to_id[example["labels"][word_idx]])
-        else:
-            label_ids.append(label_to_id[example["labels"][word_idx]])
-        previous_word_idx = word_idx
-
-    tokenized["labels"] = label_ids
-    return tokenized
-
-tokenized_datasets = dataset.map(tokenize_and_align_labels, batched=False)
-
-# ========== MODÈLE ==========
-config = AutoConfig.from_pretrained(
-    model_checkpoint,
-    num_labels=len(label_list),
-    id2label=id_to_label,
-    label2id=label_to_id
-)
-
-model = AutoModelForTokenClassification.from_pretrained(
-    model_checkpoint,
-    config=config
-)
-
-# ========== DATA COLLATOR ==========
-data_collator = DataCollatorForTokenClassification(tokenizer)
-
-# ========== MÉTRIQUES ==========
-metric = evaluate.load("seqeval")
-
-def compute_metrics(p):
-    predictions, labels = p
-    predictions = predictions.argmax(-1)
-
-    true_predictions = [
-        [id_to_label[p] for (p, l) in zip(prediction, label) if l != -100]
-        for prediction, label in zip(predictions, labels)
-    ]
-    true_labels = [
-        [id_to_label[l] for (p, l) in zip(prediction, label) if l != -100]
-        for prediction, label in zip(predictions, labels)
-    ]
-
-    return metric.compute(predictions=true_predictions, references=true_labels)
-
-# ========== ARGUMENTS D'ENTRAÎNEMENT ==========
-training_args = TrainingArguments(
-    output_dir="./ner-archetype-model",
-    evaluation_strategy="epoch",
-    save_strategy="epoch",
-    learning_rate=2e-5,
-    per_device_train_batch_size=16,
-    per_device_eval_batch_size=16,
-    num_train_epochs=5,
-    weight_decay=0.01,
-    logging_dir="./logs",
-    logging_steps=10,
-    load_best_model_at_end=True,
-    metric_for_best_model="eval_overall_f1",
-    report_to="none"
-)
-
-f1_logger = F1LoggerCallback()
-
-# ========== ENTRAÎNEMENT ==========
-trainer = Trainer(
-    model=model,
-    args=training_args,
-    train_dataset=tokenized_datasets["train"],
-    eval_dataset=tokenized_datasets["validation"],
-    tokenizer=tokenizer,
-    data_collator=data_collator,
-    compute_metrics=compute_metrics,
-    callbacks=[f1_logger]
-)
-
-all_labels = set(label for example in dataset["train"] for label in example["labels"])
-unknown_labels = all_labels - set(label_to_id.keys())
-
-if unknown_labels:
-    print("❌ Unrecognized labels found in dataset:", unknown_labels)
-    exit(1)
-
-trainer.train()
-
-metrics = trainer.evaluate(eval_dataset=tokenized_datasets["test"])
-print(metrics)
-
-print("\n📈 Historique des F1-scores par epoch :")
-for epoch, f1 in f1_logger.f1_scores:
-    print(f"Epoch {epoch:.2f} → F1 = {f1:.4f}")
-
-trainer.save_model("./ner-archetype-model")
-tokenizer.save_pretrained("./ner-archetype-model")
+import hashlib
+import inspect
+import json
+import os
+import time
+import numpy as np
+import torch
+from datasets import load_dataset, load_from_disk
+from transformers import (
+    AutoTokenizer,
+    AutoModelForTokenClassification,
+    DataCollatorForTokenClassification,
+    TrainingArguments,
+    Trainer,
+    AutoConfig,
+    TrainerCallback,
+)
+import evaluate
+
+from nerShards import SHARD_DIR, open_shards, shards_match
+from sequencePacking import PackedDataCollator, PackedDataset
+from telemetry import TELEMETRY_DIR, JsonlLog, peak_memory_bytes, write_prometheus
+from trainingProfile import training_profile
+
+DATA_FILES = {
+    "train": "ner_train.json",
+    "validation": "ner_val.json",
+    "test": "ner_test.json"
+}
+LABEL_LIST_FILE = "label_list.json"
+MODEL_CHECKPOINT = "bert-base-cased"
+OUTPUT_DIR = "./ner-archetype-model"
+MAX_LENGTH = 128  # troncature seulement, le padding est fait par batch par le data collator
+TOKENIZE_BATCH_SIZE = 1000  # exemples par appel au tokenizer
+TOKENIZE_NUM_PROC = os.cpu_count() or 1
+TOKENIZED_CACHE_DIR = "./tokenized_cache"
+PACKING = False  # concatène plusieurs exemples courts par séquence d'entraînement (voir sequencePacking.py)
+PROFILE_STEPS = None  # (premier, dernier) pas d'optimisation capturés par torch.profiler, ex. (20, 24)
+
+class F1LoggerCallback(TrainerCallback):
+    def __init__(self):
+        self.f1_scores = []
+
+    def on_evaluate(self, args, state, control, metrics, **kwargs):
+        f1 = metrics.get("eval_overall_f1")
+        if f1 is not None:
+            self.f1_scores.append((state.epoch, f1))
+            print(f"📊 F1 (epoch {state.epoch:.2f}): {f1:.4f}")
+
+class TelemetryCallback(F1LoggerCallback):
+    """
+    F1 par epoch, plus des mesures par pas d'optimisation : durée, exemples/s, tokens/s hors
+    padding, attente du dataloader, taux de padding et pic mémoire. Un événement JSONL par pas
+    dans `telemetry/train.jsonl`, les cumuls dans le textfile Prometheus `telemetry/train.prom`.
+    Les bornes de chaque batch viennent d'InstrumentedTrainer.training_step.
+    """
+
+    def __init__(self, pad_token_id, telemetry_dir=TELEMETRY_DIR, profile_steps=PROFILE_STEPS):
+        super().__init__()
+        self.pad_token_id = pad_token_id
+        self.telemetry_dir = telemetry_dir
+        self.profile_steps = profile_steps
+        self.log = None
+        self.profiler = None
+        self.totals = {"steps": 0, "samples": 0, "tokens": 0, "padded_tokens": 0, "step_seconds": 0.0,
+                       "dataloader_wait_seconds": 0.0}
+        self.last = {}
+        self._mark()
+        self._reset_step()
+
+    def _mark(self):
+        # Point de départ du prochain pas : fin du pas précédent, d'une évaluation ou d'une sauvegarde
+        self.step_start = self.last_batch_end = time.perf_counter()
+
+    def _reset_step(self):
+        self.samples = 0
+        self.tokens = 0  # tenseur une fois le premier batch vu : pas de synchronisation GPU par batch
+        self.padded_tokens = 0
+        self.dataloader_wait = 0.0
+
+    def batch_start(self, inputs):
+        self.dataloader_wait += time.perf_counter() - self.last_batch_end
+        input_ids = inputs["input_ids"]
+        mask = inputs.get("attention_mask")
+        # Masque 3D/4D du packing : on retombe sur les tokens non-pad
+        real = mask.sum() if mask is not None and mask.dim() == 2 else (input_ids != self.pad_token_id).sum()
+        self.tokens = self.tokens + real
+        self.samples += input_ids.shape[0]
+        self.padded_tokens += input_ids.numel()
+
+    def batch_end(self):
+        self.last_batch_end = time.perf_counter()
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        if state.is_world_process_zero:
+            self.log = JsonlLog(os.path.join(self.telemetry_dir, "train.jsonl"))
+            self.log.write("train_begin", max_steps=state.max_steps, batch_size=args.per_device_train_batch_size,
+                           gradient_accumulation_steps=args.gradient_accumulation_steps)
+        self._mark()
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        if self.profile_steps and state.global_step + 1 == self.profile_steps[0] and self.profiler is None:
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            self.profiler = torch.profiler.profile(activities=activities, record_shapes=True, profile_memory=True)
+            self.profiler.start()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        tokens = int(self.tokens)
+        now = time.perf_counter()
+        step_time = now - self.step_start
+        self.last = {
+            "step": state.global_step,
+            "epoch": state.epoch,
+            "step_time_s": step_time,
+            "samples_per_s": self.samples / step_time,
+            "tokens_per_s": tokens / step_time,
+            "dataloader_wait_s": self.dataloader_wait,
+            "padding_ratio": 1 - tokens / self.padded_tokens if self.padded_tokens else 0.0,
+            "peak_memory_mb": peak_memory_bytes() / 1e6,
+        }
+        self.totals["steps"] += 1
+        self.totals["samples"] += self.samples
+        self.totals["tokens"] += tokens
+        self.totals["padded_tokens"] += self.padded_tokens
+        self.totals["step_seconds"] += step_time
+        self.totals["dataloader_wait_seconds"] += self.dataloader_wait
+        if self.log is not None:
+            self.log.write("step", **self.last)
+
+        if self.profiler is not None and state.global_step >= self.profile_steps[1]:
+            self._stop_profiler()
+        self._reset_step()
+        self._mark()
+
+    def _stop_profiler(self):
+        self.profiler.stop()
+        if self.log is not None:
+            os.makedirs(self.telemetry_dir, exist_ok=True)
+            first, last = self.profile_steps
+            trace_file = os.path.join(self.telemetry_dir, f"trace_steps_{first}-{last}.json")
+            self.profiler.export_chrome_trace(trace_file)
+            print(self.profiler.key_averages().table(sort_by="self_cpu_time_total", row_limit=15))
+            print(f"🔬 Trace torch.profiler (pas {first} à {last}) → {trace_file}")
+        self.profiler = None
+
+    def on_evaluate(self, args, state, control, metrics, **kwargs):
+        super().on_evaluate(args, state, control, metrics, **kwargs)
+        if self.log is not None:
+            self.log.write("evaluate", step=state.global_step, epoch=state.epoch,
+                           **{name: value for name, value in metrics.items() if isinstance(value, (int, float))})
+        self._mark()
+
+    def on_save(self, args, state, control, **kwargs):
+        self._mark()
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        self.write_prometheus()
+
+    def on_train_end(self, args, state, control, **kwargs):
+        if self.profiler is not None:
+            self._stop_profiler()
+        self.write_prometheus()
+        if self.log is not None:
+            self.log.write("train_end", **self.totals)
+            self.log.close()
+            self.log = None
+
+    def write_prometheus(self):
+        if self.log is None:
+            return
+        totals = self.totals
+        metrics = {
+            "train_steps_total": ("counter", "Pas d'optimisation", totals["steps"]),
+            "train_samples_total": ("counter", "Séquences vues", totals["samples"]),
+            "train_tokens_total": ("counter", "Tokens hors padding", totals["tokens"]),
+            "train_padded_tokens_total": ("counter", "Tokens padding compris", totals["padded_tokens"]),
+            "train_step_seconds_total": ("counter", "Durée cumulée des pas", round(totals["step_seconds"], 6)),
+            "train_dataloader_wait_seconds_total": (
+                "counter", "Attente cumulée du dataloader", round(totals["dataloader_wait_seconds"], 6)
+            ),
+        }
+        if self.last:
+            metrics.update({
+                "train_samples_per_second": ("gauge", "Exemples/s du dernier pas", round(self.last["samples_per_s"], 3)),
+                "train_tokens_per_second": ("gauge", "Tokens/s (hors padding) du dernier pas", round(self.last["tokens_per_s"], 3)),
+                "train_padding_ratio": ("gauge", "Part de padding du dernier pas", round(self.last["padding_ratio"], 6)),
+            })
+        metrics["train_peak_memory_bytes"] = ("gauge", "Pic mémoire (GPU si CUDA, sinon RSS)", peak_memory_bytes())
+        if self.f1_scores:
+            metrics["train_eval_f1"] = ("gauge", "Dernier F1 d'évaluation", self.f1_scores[-1][1])
+        write_prometheus(os.path.join(self.telemetry_dir, "train.prom"), metrics)
+
+class InstrumentedTrainer(Trainer):
+    """Trainer qui signale le début et la fin de chaque batch au TelemetryCallback, s'il y en a un."""
+
+    def training_step(self, model, inputs, *args, **kwargs):
+        telemetry = next(
+            (callback for callback in self.callback_handler.callbacks if isinstance(callback, TelemetryCallback)), None
+        )
+        if telemetry is None:
+            return super().training_step(model, inputs, *args, **kwargs)
+        telemetry.batch_start(inputs)
+        try:
+            return super().training_step(model, inputs, *args, **kwargs)
+        finally:
+            telemetry.batch_end()
+
+# ========== ENCODAGE DES LABELS ==========
+def load_labels(label_list_file=LABEL_LIST_FILE):
+    with open(label_list_file, "r") as f:
+        label_list = json.load(f)
+
+    label_to_id = {label: i for i, label in enumerate(label_list)}
+    id_to_label = {i: label for label, i in label_to_id.items()}
+    return label_list, label_to_id, id_to_label
+
+# ========== TOKENIZER ==========
+def tokenize_and_align_labels(examples, tokenizer, label_to_id):
+    tokenized = tokenizer(
+        examples["tokens"],
+        is_split_into_words=True,
+        truncation=True,
+        max_length=MAX_LENGTH
+    )
+
+    all_label_ids = []
+    for i, word_labels in enumerate(examples["labels"]):
+        # Chaque sous-token prend le label de son mot ; l'index -1 (tokens spéciaux) tombe sur -100
+        lookup = np.array([label_to_id[label] for label in word_labels] + [-100], dtype=np.int64)
+        word_ids = np.array([-1 if w is None else w for w in tokenized.word_ids(i)], dtype=np.int64)
+        all_label_ids.append(lookup[word_ids].tolist())
+
+    tokenized["labels"] = all_label_ids
+    return tokenized
+
+def tokenization_fingerprint(tokenizer, data_files, label_list_file):
+    # Tout ce qui change le résultat de la tokenisation : données, labels, tokenizer, code
+    digest = hashlib.sha256()
+    for split in sorted(data_files):
+        with open(data_files[split], "rb") as f:
+            digest.update(split.encode("utf-8"))
+            digest.update(hashlib.sha256(f.read()).digest())
+    with open(label_list_file, "rb") as f:
+        digest.update(f.read())
+    # Sans l'état de troncature/padding, que le tokenizer garde d'un appel à l'autre
+    tokenizer_state = json.loads(tokenizer.backend_tokenizer.to_str())
+    tokenizer_state.pop("truncation", None)
+    tokenizer_state.pop("padding", None)
+    digest.update(json.dumps(tokenizer_state, sort_keys=True).encode("utf-8"))
+    digest.update(str(MAX_LENGTH).encode("utf-8"))
+    digest.update(inspect.getsource(tokenize_and_align_labels).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def load_tokenized_datasets(dataset, tokenizer, label_to_id, data_files=DATA_FILES,
+                            label_list_file=LABEL_LIST_FILE, cache_dir=TOKENIZED_CACHE_DIR):
+    cache_path = os.path.join(cache_dir, tokenization_fingerprint(tokenizer, data_files, label_list_file))
+    if os.path.isdir(cache_path):
+        print(f"♻️ Dataset tokenisé rechargé depuis {cache_path}")
+        return load_from_disk(cache_path)
+
+    num_proc = max(1, min(TOKENIZE_NUM_PROC, len(dataset["train"]) // TOKENIZE_BATCH_SIZE))
+    tokenized_datasets = dataset.map(
+        tokenize_and_align_labels,
+        batched=True,
+        batch_size=TOKENIZE_BATCH_SIZE,
+        num_proc=num_proc,
+        remove_columns=dataset["train"].column_names,
+        fn_kwargs={"tokenizer": tokenizer, "label_to_id": label_to_id},
+    )
+    tokenized_datasets.save_to_disk(cache_path)
+    print(f"💾 Dataset tokenisé sauvegardé dans {cache_path}")
+    return tokenized_datasets
+
+def load_json_datasets(tokenizer, label_to_id, data_files=DATA_FILES):
+    # Chemin JSON : re-tokenisation des tokens de prepareNerData (avec cache sur disque)
+    dataset = load_dataset(
+        "json",
+        data_files=data_files,
+        field=None
+    )
+
+    all_labels = set(label for example in dataset["train"] for label in example["labels"])
+    unknown_labels = all_labels - set(label_to_id.keys())
+
+    if unknown_labels:
+        print("❌ Unrecognized labels found in dataset:", unknown_labels)
+        exit(1)
+
+    return load_tokenized_datasets(dataset, tokenizer, label_to_id, data_files)
+
+# ========== MÉTRIQUES ==========
+def reduce_logits(logits, labels):
+    # Réduit les logits (batch × séquence × labels) aux ids prédits avant que le Trainer les accumule
+    if isinstance(logits, tuple):
+        logits = logits[0]
+    return logits.argmax(-1)
+
+def build_compute_metrics(label_list):
+    metric = evaluate.load("seqeval")
+    label_names = np.array(label_list, dtype=object)
+
+    def compute_metrics(p):
+        predictions, labels = p
+        if predictions.ndim == 3:
+            predictions = predictions.argmax(-1)  # logits complets (sans reduce_logits)
+
+        mask = labels != -100
+        true_predictions = [label_names[prediction[m]].tolist() for prediction, m in zip(predictions, mask)]
+        true_labels = [label_names[label[m]].tolist() for label, m in zip(labels, mask)]
+
+        return metric.compute(predictions=true_predictions, references=true_labels)
+
+    return compute_metrics
+
+def main():
+    # GPU si disponible, sinon profil CPU (threads, bf16, accumulation de gradient)
+    profile = training_profile()
+
+    # ========== CHARGEMENT DU DATASET ==========
+    label_list, label_to_id, id_to_label = load_labels()
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_CHECKPOINT)
+
+    if shards_match(tokenizer, label_list, data_files=DATA_FILES):
+        # Ids déjà calculés par prepareNerData : lecture par mmap, aucune tokenisation
+        tokenized_datasets = open_shards(SHARD_DIR, MAX_LENGTH)
+        print(f"🧱 Shards binaires chargés depuis {SHARD_DIR}")
+    else:
+        tokenized_datasets = load_json_datasets(tokenizer, label_to_id)
+
+    print(f"Train size: {len(tokenized_datasets['train'])}")
+    print(f"Validation size: {len(tokenized_datasets['validation'])}")
+    print(f"Test size: {len(tokenized_datasets['test'])}")
+
+    # ========== MODÈLE ==========
+    config = AutoConfig.from_pretrained(
+        MODEL_CHECKPOINT,
+        num_labels=len(label_list),
+        id2label=id_to_label,
+        label2id=label_to_id
+    )
+
+    model = AutoModelForTokenClassification.from_pretrained(
+        MODEL_CHECKPOINT,
+        config=config
+    )
+
+    # ========== DATA COLLATOR ==========
+    train_dataset = tokenized_datasets["train"]
+    if PACKING:
+        # Séquences packées pour l'entraînement ; l'évaluation reste par exemple d'origine
+        train_dataset = PackedDataset(train_dataset, MAX_LENGTH)
+        data_collator = PackedDataCollator(tokenizer)
+        print(f"📦 Packing : {len(tokenized_datasets['train'])} exemples → {len(train_dataset)} séquences")
+    else:
+        # Padding dynamique : chaque batch est paddé à son plus long exemple
+        data_collator = DataCollatorForTokenClassification(tokenizer)
+
+    # ========== MÉTRIQUES ==========
+    compute_metrics = build_compute_metrics(label_list)
+
+    # ========== ARGUMENTS D'ENTRAÎNEMENT ==========
+    training_args = TrainingArguments(
+        output_dir=OUTPUT_DIR,
+        evaluation_strategy="epoch",
+        save_strategy="epoch",
+        learning_rate=2e-5,
+        per_device_eval_batch_size=16,
+        num_train_epochs=5,
+        weight_decay=0.01,
+        logging_dir="./logs",
+        logging_steps=10,
+        load_best_model_at_end=True,
+        metric_for_best_model="eval_overall_f1",
+        report_to="none",
+        **profile
+    )
+
+    # F1 par epoch + mesures par pas (voir telemetry/)
+    f1_logger = TelemetryCallback(tokenizer.pad_token_id)
+
+    # ========== ENTRAÎNEMENT ==========
+    trainer = InstrumentedTrainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=tokenized_datasets["validation"],
+        tokenizer=tokenizer,
+        data_collator=data_collator,
+        compute_metrics=compute_metrics,
+        preprocess_logits_for_metrics=reduce_logits,
+        callbacks=[f1_logger]
+    )
+
+    trainer.train()
+
+    metrics = trainer.evaluate(eval_dataset=tokenized_datasets["test"])
+    print(metrics)
+
+    print("\n📈 Historique des F1-scores par epoch :")
+    for epoch, f1 in f1_logger.f1_scores:
+        print(f"Epoch {epoch:.2f} → F1 = {f1:.4f}")
+
+    trainer.save_model(OUTPUT_DIR)
+    tokenizer.save_pretrained(OUTPUT_DIR)
+
+if __name__ == "__main__":
+    main()
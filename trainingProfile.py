@@ -0,0 +1,77 @@
+import os
+
+import torch
+
+EFFECTIVE_BATCH_SIZE = 16  # taille de batch vue par l'optimiseur, quel que soit le device
+GPU_BATCH_SIZE = 16
+CPU_BATCH_SIZE = 8
+BF16_CPU_FLAGS = ("avx512_bf16", "amx_bf16")
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def cpu_supports_bf16():
+    # bf16 n'est rentable sur CPU qu'avec les instructions natives (AVX512-BF16 / AMX)
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return any(flag in flags for flag in BF16_CPU_FLAGS)
+
+
+def detect_device():
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def configure_cpu_threads(intra_op_threads, inter_op_threads):
+    torch.set_num_threads(intra_op_threads)
+    try:
+        torch.set_num_interop_threads(inter_op_threads)
+    except RuntimeError:
+        pass  # déjà fixé : n'est possible qu'avant le premier calcul parallèle
+
+
+def training_profile(device=None, num_threads=None, dataloader_workers=None, bf16=None, batch_size=None):
+    """
+    Arguments de TrainingArguments adaptés à la machine. Sur CPU, fixe aussi les threads
+    intra-op / inter-op de torch. Le batch effectif reste EFFECTIVE_BATCH_SIZE grâce à
+    l'accumulation de gradient.
+    """
+    device = device or detect_device()
+
+    if device == "cuda":
+        print(f"🖥️ GPU : {torch.cuda.get_device_name(0)}")
+        batch_size = batch_size or GPU_BATCH_SIZE
+        return {
+            "per_device_train_batch_size": batch_size,
+            "gradient_accumulation_steps": max(1, EFFECTIVE_BATCH_SIZE // batch_size),
+        }
+
+    cores = available_cores()
+    if dataloader_workers is None:
+        dataloader_workers = 2 if cores >= 16 else 0  # les workers prennent des coeurs au calcul
+    if num_threads is None:
+        num_threads = max(1, cores - dataloader_workers)
+    if bf16 is None:
+        bf16 = cpu_supports_bf16()
+    batch_size = batch_size or CPU_BATCH_SIZE
+
+    configure_cpu_threads(num_threads, max(1, min(4, cores // 8)))
+    print(
+        f"🖥️ CPU : {cores} coeurs, {num_threads} threads intra-op, {torch.get_num_interop_threads()} inter-op, "
+        f"{dataloader_workers} workers DataLoader, bf16={'oui' if bf16 else 'non'}"
+    )
+
+    return {
+        "use_cpu": True,
+        "bf16": bf16,
+        "dataloader_num_workers": dataloader_workers,
+        "per_device_train_batch_size": batch_size,
+        "gradient_accumulation_steps": max(1, EFFECTIVE_BATCH_SIZE // batch_size),
+    }